@@ -7,6 +7,7 @@ from app.routes.lead_routes import lead_bp
 from app.routes.appointment_routes import appointment_bp
 from app.routes.auth_routes import auth_bp
 from app.routes.cron_job_routes import cron_job_bp
+from app.routes.webhook_routes import webhook_bp
 
 load_dotenv()
 
@@ -36,6 +37,7 @@ def create_app():
     app.register_blueprint(appointment_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(cron_job_bp)
+    app.register_blueprint(webhook_bp)
 
     
     register_error_handlers(app)
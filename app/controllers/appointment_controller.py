@@ -17,5 +17,13 @@ class AppointmentController:
         return jsonify(result), 201
 
     def list(self):
-        result = self.service.list_busy_slots()
+        result = self.service.list_busy_slots(
+            date_from=request.args.get("from"),
+            date_to=request.args.get("to"),
+            week=request.args.get("week"),
+        )
+        return jsonify(result), 200
+
+    def status(self):
+        result = self.service.get_appointment_status(request.args.get("leadToken"))
         return jsonify(result), 200
@@ -6,8 +6,4 @@ class CronJobController:
         self.service = service
 
     def run(self):
-        confirmarion_messages = self.service.send_confirmation_messager()
-        recovery_message = self.service.send_recovery_message()
-        meeting_reminder = self.service.send_meeting_reminder()
-
-        return {"confirmarion_messages": confirmarion_messages, "recovery_message": recovery_message, "meeting_reminder": meeting_reminder}, 200
\ No newline at end of file
+        return self.service.run_all(), 200
\ No newline at end of file
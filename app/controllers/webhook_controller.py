@@ -0,0 +1,15 @@
+from flask import request, jsonify
+from app.interfaces.services.webhook_service_interface import WebhookServiceInterface
+from app.security.validate_webhook_secret import validate_webhook_secret
+
+
+class WebhookController:
+
+    def __init__(self, service: WebhookServiceInterface):
+        self.service = service
+
+    @validate_webhook_secret
+    def pipedrive(self):
+        data = request.get_json(silent=True) or {}
+        result = self.service.handle_pipedrive_event(data, request.get_data())
+        return jsonify(result), 200
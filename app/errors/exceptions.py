@@ -0,0 +1,8 @@
+class SlotUnavailableError(Exception):
+    """O horário solicitado já foi reservado por outro lead."""
+    pass
+
+
+class JobCancelledError(Exception):
+    """O job de agendamento foi cancelado (reagendamento) enquanto era executado."""
+    pass
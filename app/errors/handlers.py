@@ -1,6 +1,7 @@
 from flask import jsonify
 from mongoengine.errors import NotUniqueError, ValidationError
 import logging
+from app.errors.exceptions import SlotUnavailableError
 
 
 def register_error_handlers(app):
@@ -26,6 +27,13 @@ def register_error_handlers(app):
             "status": "error"
         }), 409
 
+    @app.errorhandler(SlotUnavailableError)
+    def handle_slot_unavailable_error(error):
+        return jsonify({
+            "mensagem": str(error) or "Horário indisponível",
+            "status": "error"
+        }), 409
+
     @app.errorhandler(Exception)
     def handle_generic_error(error):
         app.logger.exception(error)
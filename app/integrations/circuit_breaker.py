@@ -0,0 +1,78 @@
+import threading
+import time
+from app.utils.logging_config import logger
+
+
+class CircuitOpenError(Exception):
+    """O circuito está aberto: a integração está indisponível e a chamada não foi feita."""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Disjuntor compartilhado pelas threads do processo.
+
+    Depois de `failure_threshold` falhas seguidas o circuito abre e as chamadas são
+    recusadas sem tocar na rede. Passado `reset_timeout`, uma única chamada de teste é
+    liberada (meio-aberto): sucesso fecha o circuito, falha o reabre.
+    """
+
+    STATE_CLOSED = "closed"
+    STATE_OPEN = "open"
+    STATE_HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def before_call(self):
+        """Levanta CircuitOpenError se a chamada não puder ser feita agora."""
+        with self._lock:
+            if self._state == self.STATE_CLOSED:
+                return
+
+            if self._state == self.STATE_OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"{self.name}: circuito aberto")
+                self._state = self.STATE_HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._probe_in_flight:
+                raise CircuitOpenError(f"{self.name}: circuito em teste")
+            self._probe_in_flight = True
+
+    def abandon_call(self):
+        """A chamada liberada por before_call não foi feita: libera a vaga de teste sem registrar resultado."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.STATE_CLOSED:
+                logger.info(f"[{self.name}] Circuito fechado, integração disponível novamente.")
+            self._state = self.STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+
+            if self._state == self.STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.STATE_OPEN:
+                    logger.warning(f"[{self.name}] Circuito aberto após {self._failures} falha(s) seguidas; pausando por {self.reset_timeout:.0f}s")
+                self._state = self.STATE_OPEN
+                self._opened_at = time.monotonic()
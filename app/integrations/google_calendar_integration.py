@@ -3,13 +3,16 @@ import datetime
 import calendar
 import dateutil.parser
 import dateutil.tz
+import threading
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from app.utils.logging_config import logger
+from app.utils.availability_engine import build_available_days
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
@@ -17,42 +20,117 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 CREDENTIALS_FILE = os.path.join(BASE_DIR, 'credentials', 'credentials.json')
 TOKEN_FILE = os.path.join(BASE_DIR, 'credentials', 'token.json')
+CALENDAR_ID = 'primary'
 
-def get_calendar_service():
-    """Autentica o usuário usando OAuth 2.0 e retorna o serviço do Calendar."""
-    creds = None
-    
-    if os.path.exists(TOKEN_FILE):
-        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            logger.info("[GOOGLE_CALENDAR_INTEGRATION] Renovando token expirado...")
-            creds.refresh(Request())
-        else:
+class CalendarClientPool:
+    """
+    Mantém as credenciais e o serviço do Calendar vivos durante todo o processo.
+
+    As credenciais são carregadas uma única vez por worker e renovadas apenas quando
+    estão perto de expirar. Como o httplib2 não é thread-safe, cada thread recebe
+    sua própria instância do serviço (construída uma vez e reutilizada).
+    """
+
+    REFRESH_MARGIN = timedelta(minutes=5)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._creds = None
+        self._generation = 0
+        self._stats = {"builds": 0, "refreshes": 0, "credential_loads": 0}
+
+    def _reset_after_fork(self):
+        """Descarta o estado herdado do processo master do gunicorn após o fork."""
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._local = threading.local()
+            self._pid = os.getpid()
+            self._creds = None
+            self._generation += 1
+
+    def _load_credentials(self):
+        creds = None
+
+        if os.path.exists(TOKEN_FILE):
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+            self._stats["credential_loads"] += 1
+
+        if not creds or (not creds.valid and not creds.refresh_token):
             logger.info("[GOOGLE_CALENDAR_INTEGRATION] Iniciando fluxo de login no navegador...")
             if not os.path.exists(CREDENTIALS_FILE):
                 raise FileNotFoundError(f"Arquivo não encontrado: {CREDENTIALS_FILE}. Baixe o OAuth Client ID do Google Cloud.")
-                
+
             flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
             creds = flow.run_local_server(port=0)
+            self._save_credentials(creds)
 
+        return creds
+
+    def _save_credentials(self, creds):
         with open(TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
             logger.info(f"[GOOGLE_CALENDAR_INTEGRATION] Token salvo em: {TOKEN_FILE}")
 
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+    def _needs_refresh(self, creds) -> bool:
+        if not creds.valid:
+            return True
+        if creds.expiry is None:
+            return False
+        # google-auth trabalha com expiry "naive" em UTC
+        return creds.expiry - datetime.utcnow() <= self.REFRESH_MARGIN
 
-def get_free_busy_slots() -> list:
-    """Consulta os horários ocupados na agenda."""
-    service = get_calendar_service()
-    calendar_id = 'primary'
+    def get_credentials(self):
+        """Retorna credenciais válidas, renovando-as apenas quando perto da expiração."""
+        self._reset_after_fork()
 
-    tz_brasilia = dateutil.tz.gettz('America/Sao_Paulo')
+        creds = self._creds
+        if creds is not None and not self._needs_refresh(creds):
+            return creds
+
+        with self._lock:
+            if self._creds is None:
+                self._creds = self._load_credentials()
+
+            if self._needs_refresh(self._creds) and self._creds.refresh_token:
+                logger.info("[GOOGLE_CALENDAR_INTEGRATION] Renovando token expirado...")
+                self._creds.refresh(Request())
+                self._stats["refreshes"] += 1
+                self._save_credentials(self._creds)
+                logger.info(f"[GOOGLE_CALENDAR_INTEGRATION] Token renovado ({self._stats})")
+
+            return self._creds
+
+    def get_service(self):
+        """Retorna o serviço do Calendar da thread atual, construindo-o apenas na primeira vez."""
+        creds = self.get_credentials()
+
+        service = getattr(self._local, "service", None)
+        if service is not None and self._local.generation == self._generation:
+            return service
+
+        service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
+        with self._lock:
+            self._stats["builds"] += 1
+            logger.info(f"[GOOGLE_CALENDAR_INTEGRATION] Serviço do Calendar construído para a thread ({self._stats})")
+
+        self._local.service = service
+        self._local.generation = self._generation
+        return service
+
+
+_calendar_pool = CalendarClientPool()
+
+
+def get_calendar_service():
+    """Retorna o serviço do Calendar reaproveitado pelo pool do processo."""
+    return _calendar_pool.get_service()
+
+def _default_window(tz_brasilia) -> tuple:
+    """Janela padrão: de agora até o fim do próximo mês."""
     now = datetime.now(tz_brasilia)
 
-    # Lógica para pegar até o fim do próximo mês
     if now.month == 12:
         next_month = 1
         year = now.year + 1
@@ -62,10 +140,18 @@ def get_free_busy_slots() -> list:
 
     last_day = calendar.monthrange(year, next_month)[1]
     end_date = datetime(year, next_month, last_day, 23, 59, 59, tzinfo=tz_brasilia)
+    return now, end_date
+
+def get_busy_intervals(time_min: datetime, time_max: datetime) -> list | None:
+    """Consulta o freebusy e retorna os intervalos ocupados como (inicio, fim) no horário de Brasília."""
+    service = get_calendar_service()
+    calendar_id = CALENDAR_ID
+
+    tz_brasilia = dateutil.tz.gettz('America/Sao_Paulo')
 
     body = {
-        "timeMin": now.astimezone(dateutil.tz.UTC).isoformat().replace('+00:00', 'Z'),
-        "timeMax": end_date.astimezone(dateutil.tz.UTC).isoformat().replace('+00:00', 'Z'),
+        "timeMin": time_min.astimezone(dateutil.tz.UTC).isoformat().replace('+00:00', 'Z'),
+        "timeMax": time_max.astimezone(dateutil.tz.UTC).isoformat().replace('+00:00', 'Z'),
         "items": [{"id": calendar_id}]
     }
 
@@ -73,88 +159,77 @@ def get_free_busy_slots() -> list:
         freebusy_result = service.freebusy().query(body=body).execute()
         busy_slots_raw = freebusy_result['calendars'][calendar_id]['busy']
 
-        formatted_slots = []
-
-        logger.info(f"[GOOGLE_CALENDAR_INTEGRATION] Horários Ocupados Detectados")
-        for slot in busy_slots_raw:
-            start_utc = dateutil.parser.isoparse(slot['start'])
-            end_utc = dateutil.parser.isoparse(slot['end'])
+        intervals = [
+            (
+                dateutil.parser.isoparse(slot['start']).astimezone(tz_brasilia),
+                dateutil.parser.isoparse(slot['end']).astimezone(tz_brasilia),
+            )
+            for slot in busy_slots_raw
+        ]
 
-            start_br = start_utc.astimezone(tz_brasilia)
-            end_br = end_utc.astimezone(tz_brasilia)
-
-            slot_data = {
-                "data": start_br.strftime('%Y-%m-%d'),
-                "hora_inicio": start_br.strftime('%H:%M'),
-                "hora_fim": end_br.strftime('%H:%M')
-            }
-            formatted_slots.append(slot_data)
-            logger.info(f"[GOOGLE_CALENDAR_INTEGRATION] Quantidade de horários livres: {len(formatted_slots)}")
-
-        return formatted_slots
+        logger.info(f"[GOOGLE_CALENDAR_INTEGRATION] Horários ocupados detectados: {len(intervals)}")
+        return intervals
 
     except Exception as e:
         logger.error(f"[GOOGLE_CALENDAR_INTEGRATION] Erro ao consultar disponibilidade: {e}")
         return None
 
-def get_available_slots():
-    """Gera lista de horários livres, descartando o dia se houver qualquer ocupação."""
-    busy_slots = get_free_busy_slots()
-    if busy_slots is None:
-        return []
-
+def get_free_busy_slots() -> list:
+    """Consulta os horários ocupados na agenda."""
     tz_brasilia = dateutil.tz.gettz('America/Sao_Paulo')
+    now, end_date = _default_window(tz_brasilia)
 
-    START_HOUR = 9
-    END_HOUR = 19
-    
-    now = datetime.now(tz_brasilia)
-    
-    # Define data limite (fim do próximo mês)
-    if now.month == 12:
-        end_date = datetime(now.year + 1, 1, calendar.monthrange(now.year + 1, 1)[1])
-    else:
-        end_date = datetime(now.year, now.month + 1, calendar.monthrange(now.year, now.month + 1)[1])
+    intervals = get_busy_intervals(now, end_date)
+    if intervals is None:
+        return None
 
-    available_days = []
-    current_day = now.date() + timedelta(days=1)
+    return [
+        {
+            "data": start_br.strftime('%Y-%m-%d'),
+            "hora_inicio": start_br.strftime('%H:%M'),
+            "hora_fim": end_br.strftime('%H:%M')
+        }
+        for start_br, end_br in intervals
+    ]
 
-    while current_day <= end_date.date():
-        if current_day.weekday() >= 5:
-            current_day += timedelta(days=1)
-            continue
+def get_available_slots(first_day: date = None, last_day: date = None):
+    """
+    Gera lista de horários livres, marcando cada slot de uma hora individualmente.
+    Sem intervalo informado, cobre de amanhã até o fim do próximo mês.
+    """
+    tz_brasilia = dateutil.tz.gettz('America/Sao_Paulo')
+    now, end_date = _default_window(tz_brasilia)
 
-        is_day_busy = any(
-            s['data'] == current_day.isoformat()
-            for s in busy_slots
-        )
+    first_day = max(first_day or now.date() + timedelta(days=1), now.date() + timedelta(days=1))
+    last_day = last_day or end_date.date()
 
-        if is_day_busy:
-            current_day += timedelta(days=1)
-            continue
-        
-        day_slots = []
-        for hour in range(START_HOUR, END_HOUR):
-            day_slots.append({
-                "time": f"{hour:02d}:00",
-                "available": True
-            })
+    if last_day < first_day:
+        return []
 
-        available_days.append({
-            "date": current_day.isoformat(),
-            "slots": day_slots
-        })
+    # A consulta ao Google cobre apenas a janela pedida
+    time_min = datetime(first_day.year, first_day.month, first_day.day, tzinfo=tz_brasilia)
+    time_max = datetime(last_day.year, last_day.month, last_day.day, 23, 59, 59, tzinfo=tz_brasilia)
 
-        current_day += timedelta(days=1)
+    busy_intervals = get_busy_intervals(time_min, time_max)
+    if busy_intervals is None:
+        return []
 
-    return available_days
+    return build_available_days(
+        busy_intervals,
+        first_day=first_day,
+        last_day=last_day,
+        tz=tz_brasilia,
+    )
 
-def create_event(summary: str, description: str, start_time: datetime, lead_email: str, lead_name: str, duration_hours: int = 1) -> dict:
+def create_event(summary: str, description: str, start_time: datetime, lead_email: str, lead_name: str, duration_hours: int = 1, event_id: str = None) -> dict:
     """
     Cria evento com Google Meet e convida o participante via OAuth 2.0.
+
+    Com `event_id` (base32hex: 0-9 e a-v) a criação é idempotente: se o evento já
+    existir (409), o evento existente é retornado em vez de criar um duplicado.
     """
     service = get_calendar_service()
-    calendar_id = 'primary'
+    calendar_id = CALENDAR_ID
 
     logger.info(f"[GOOGLE_CALENDAR_INTEGRATION] Criando evento")
 
@@ -173,7 +248,7 @@ def create_event(summary: str, description: str, start_time: datetime, lead_emai
         },
         'conferenceData': {
             'createRequest': {
-                'requestId': f"meet-{int(datetime.now().timestamp())}",
+                'requestId': event_id or f"meet-{int(datetime.now().timestamp())}",
                 'conferenceSolutionKey': {'type': 'hangoutsMeet'}
             },
         },
@@ -189,6 +264,9 @@ def create_event(summary: str, description: str, start_time: datetime, lead_emai
         },
     }
 
+    if event_id:
+        event_body['id'] = event_id
+
     try:
         event = service.events().insert(
             calendarId=calendar_id, 
@@ -204,6 +282,37 @@ def create_event(summary: str, description: str, start_time: datetime, lead_emai
         logger.info(f"[GOOGLE_CALENDAR_INTEGRATION] 📹 Google Meet da reunião gerado")
         
         return event
+    except HttpError as e:
+        if event_id and e.resp.status == 409:
+            logger.info("[GOOGLE_CALENDAR_INTEGRATION] Evento já existia, reaproveitando")
+            try:
+                return service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+            except Exception as get_error:
+                logger.error(f"[GOOGLE_CALENDAR_INTEGRATION] ❌ Erro ao buscar evento existente: {get_error}")
+                return None
+
+        logger.error(f"[GOOGLE_CALENDAR_INTEGRATION] ❌ Erro ao criar evento: {e}")
+        return None
     except Exception as e:
         logger.error(f"[GOOGLE_CALENDAR_INTEGRATION] ❌ Erro ao criar evento: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def delete_event(event_id: str) -> bool:
+    """
+    Remove o evento e avisa os convidados. Retorna True se o evento foi removido
+    ou não existia (404/410), False em caso de falha.
+    """
+    service = get_calendar_service()
+
+    try:
+        service.events().delete(calendarId=CALENDAR_ID, eventId=event_id, sendUpdates='all').execute()
+        logger.info("[GOOGLE_CALENDAR_INTEGRATION] Evento removido")
+        return True
+    except HttpError as e:
+        if e.resp.status in (404, 410):
+            return True
+        logger.error(f"[GOOGLE_CALENDAR_INTEGRATION] ❌ Erro ao remover evento: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"[GOOGLE_CALENDAR_INTEGRATION] ❌ Erro ao remover evento: {e}")
+        return False
@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from app.integrations.rate_limiter import PRIORITY_INTERACTIVE, TokenBucketLimiter
+from app.utils.logging_config import logger
+
+
+class RateLimitBudgetExhausted(requests.exceptions.RequestException):
+    """Não houve orçamento de requisições disponível dentro do tempo limite."""
+    pass
+
+
+class HttpTransport:
+    """
+    Transporte HTTP compartilhado pelas integrações.
+
+    - Sessão com pool de conexões keep-alive (evita um handshake TLS por chamada)
+    - Timeouts de conexão/leitura em toda requisição
+    - Backoff exponencial com jitter em 429/5xx, respeitando o header Retry-After
+    - Latência registrada por chamada
+    - Limitador de taxa opcional (token bucket), consultado antes de cada tentativa
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    # Status em que o servidor garantidamente não processou a requisição (seguro repetir POST)
+    SAFE_RETRY_STATUSES = (429, 503)
+
+    def __init__(self, name: str, pool_maxsize: int = 10, connect_timeout: float = 3.05, read_timeout: float = 15, max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 20, rate_limiter: TokenBucketLimiter = None):
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+    def _backoff_delay(self, attempt: int, response: requests.Response = None) -> float:
+        retry_after = self._retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+
+        # Full jitter: espalha os retries de vários workers no tempo
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after_seconds(self, response: requests.Response):
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def _record(self, elapsed_ms: float, retried: bool = False, failed: bool = False):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["total_ms"] += elapsed_ms
+            self._stats["max_ms"] = max(self._stats["max_ms"], elapsed_ms)
+            if retried:
+                self._stats["retries"] += 1
+            if failed:
+                self._stats["errors"] += 1
+
+    def request(self, method: str, url: str, label: str = None, priority: int = PRIORITY_INTERACTIVE, **kwargs) -> requests.Response:
+        """
+        Executa a requisição com timeout e retry. Retorna a última resposta recebida
+        ou levanta a última `requests.RequestException` quando nenhuma resposta chegou.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        idempotent = method.upper() in ("GET", "PUT", "DELETE", "HEAD", "OPTIONS")
+        label = label or method.upper()
+
+        for attempt in range(self.max_retries + 1):
+            is_last = attempt == self.max_retries
+
+            if self.rate_limiter and not self.rate_limiter.acquire(priority):
+                raise RateLimitBudgetExhausted(f"{label}: orçamento de requisições esgotado")
+
+            started = time.perf_counter()
+
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                # Sem conexão estabelecida o servidor não recebeu nada: seguro repetir qualquer método
+                can_retry = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                self._record(elapsed_ms, retried=can_retry and not is_last, failed=True)
+                logger.warning(f"[{self.name}] {label} falhou em {elapsed_ms:.0f} ms (tentativa {attempt + 1}): {e}")
+
+                if is_last or not can_retry:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                continue
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if self.rate_limiter:
+                self.rate_limiter.observe(response.status_code, response.headers)
+
+            retry_statuses = self.RETRY_STATUSES if idempotent else self.SAFE_RETRY_STATUSES
+            should_retry = response.status_code in retry_statuses and not is_last
+
+            self._record(elapsed_ms, retried=should_retry, failed=response.status_code >= 400)
+            logger.debug(f"[{self.name}] {label} -> {response.status_code} em {elapsed_ms:.0f} ms")
+
+            if not should_retry:
+                return response
+
+            delay = self._backoff_delay(attempt, response)
+            logger.warning(f"[{self.name}] {label} retornou {response.status_code}, nova tentativa em {delay:.1f}s")
+            time.sleep(delay)
+
+        return response
+
+    def stats(self) -> dict:
+        """Contadores e latência acumulada das chamadas deste transporte."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_ms"] = stats["total_ms"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
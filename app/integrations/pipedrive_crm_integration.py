@@ -3,46 +3,120 @@ import os
 import dateutil
 from dotenv import load_dotenv
 import requests
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from typing import Callable, Dict, Iterator, Optional
 from app.utils.logging_config import logger
+from app.integrations.http_transport import HttpTransport
+from app.integrations.pipedrive_field_registry import PipedriveFieldRegistry
+from app.integrations.pipedrive_mutation_buffer import PipedriveMutationBuffer
+from app.integrations.rate_limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, TokenBucketLimiter
 
 
 load_dotenv()
 
+# Transporte compartilhado por todas as instâncias do cliente no processo (pool keep-alive)
+_pipedrive_transport = HttpTransport(
+    "PIPEDRIVE_CRM_INTEGRATION",
+    pool_maxsize=int(os.getenv("PIPEDRIVE_POOL_SIZE", 10)),
+    connect_timeout=float(os.getenv("PIPEDRIVE_CONNECT_TIMEOUT", 3.05)),
+    read_timeout=float(os.getenv("PIPEDRIVE_READ_TIMEOUT", 15)),
+    max_retries=int(os.getenv("PIPEDRIVE_MAX_RETRIES", 3)),
+    rate_limiter=TokenBucketLimiter(
+        "PIPEDRIVE_CRM_INTEGRATION",
+        rate_per_second=float(os.getenv("PIPEDRIVE_RATE_PER_SECOND", 10)),
+        capacity=int(os.getenv("PIPEDRIVE_RATE_BURST", 20)),
+    ),
+)
+
+# Executor limitado para chamadas independentes ao Pipedrive (compartilhado pelo processo)
+_pipedrive_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PIPEDRIVE_MAX_CONCURRENCY", 4)),
+    thread_name_prefix="pipedrive",
+)
+
+
+class PipedriveBatchOutcome:
+    """Resultado estruturado de chamadas executadas em paralelo: resultados e erros por nome."""
+
+    def __init__(self):
+        self.results = {}
+        self.errors = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "results": self.results,
+            "errors": {name: str(error) for name, error in self.errors.items()},
+        }
+
+
 class PipedriveClient:
 
+    _field_registry = None
+
     def __init__(self):
         self.api_token = os.getenv("PIPEDRIVE_API_TOKEN")
         self.owner_id = int(os.getenv("PIPEDRIVE_OWNER_ID"))
 
         self.base_url = "https://api.pipedrive.com/v1"
+        self.transport = _pipedrive_transport
         self.visible_to = 3
 
-        # --- IDs DOS CAMPOS PERSONALIZADOS ---
-        # self.FIELD_SEGMENTO = "fbc308cdf13795575d40d7f17a95487f477daa0e"
-        # self.FIELD_FATURAMENTO = "df91788afb1cb9e7d7949727684e895b6deb1a29"
-        # self.FIELD_FUNCIONARIOS = "5095a2aeccdc56ca262471a7731d9e54aa0edaee"
-        # self.FIELD_PRODUTO = "ee0b4513ad28a2f52edbc8b4252f0fdc33cd7fd5"
-        # self.FIELD_MOTIVO_IA = "0a605b9668c110080cd956312ac51b11a7855621"
-        # self.FIELD_DESAFIO = "26067d9464f84b9c8979452fcdf9d0197aa9cf37"
-        # self.FIELD_MOMENTO = "9ecee0c9e0b9232313912a5082dac228d299dcea"
-        # self.FIELD_CAPACIDADE_INVESTIMENTO = "8c4d7b17bad6d31b26c3f24a6aa68d39628e49dc"
-
-        self.FIELD_SEGMENTO = "3bba6a3886d88fa043d916830d8e3fa63704b325"
-        self.FIELD_FATURAMENTO = "5dc337302075b541c01d5b4b43cdc18c6d069ac9"
-        self.FIELD_FUNCIONARIOS = "d12a57b7469d8e92be6922544fb6534ca4ed1e21"
-        self.FIELD_PRODUTO = "675a446167008ae9d3aca7c95e57189b9199eb29"
-        self.FIELD_MOTIVO_IA = "0a605b9668c110080cd956312ac51b11a7855621"
-        self.FIELD_DESAFIO = "5c6b52fb5611bf4d30e6a7a69499b23ea6c76b47"
-        self.FIELD_MOMENTO = "33a533f719c6d40e15e3ccff84a36002ac6209c9"
-        self.FIELD_CAPACIDADE_INVESTIMENTO = "d6d6bd34a685a23f535f5de7170d343602ec59b3"
+        # IDs dos campos personalizados e das opções vêm do registro (metadados do Pipedrive)
+        if PipedriveClient._field_registry is None:
+            PipedriveClient._field_registry = PipedriveFieldRegistry(fetch=self._get)
+        self.field_registry = PipedriveClient._field_registry
+
+    def run_concurrently(self, calls: Dict[str, Callable[[], object]], timeout: float = 120) -> PipedriveBatchOutcome:
+        """
+        Executa chamadas independentes em paralelo no executor limitado do processo.
+        Um resultado None (falha já tratada pelos helpers) também é registrado como erro.
+        """
+        outcome = PipedriveBatchOutcome()
+        futures = {_pipedrive_executor.submit(call): name for name, call in calls.items()}
+
+        def collect(future, name):
+            try:
+                result = future.result()
+            except Exception as e:
+                outcome.errors[name] = e
+                return
+
+            if result is None:
+                outcome.errors[name] = RuntimeError(f"Pipedrive não confirmou {name}")
+            else:
+                outcome.results[name] = result
+
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                collect(future, futures[future])
+        except FuturesTimeoutError:
+            for future, name in futures.items():
+                if name in outcome.results or name in outcome.errors:
+                    continue
+                if future.done():
+                    # Terminou junto com o timeout, mas ainda não tinha sido entregue pelo as_completed
+                    collect(future, name)
+                    continue
+
+                # Chamadas ainda na fila são canceladas para não rodarem depois do retry do job
+                future.cancel()
+                outcome.errors[name] = TimeoutError(f"Tempo esgotado em {name}")
+
+        return outcome
 
     def _get_headers(self):
         return {"Content-Type": "application/json"}
     
-    def create_activity(self, subject: str, type: str, due_date: str, due_time: str, person_id: int, org_id: int, deal_id: int = None) -> dict:
+    def create_activity(self, subject: str, type: str, due_date: str, due_time: str, person_id: int, org_id: int, deal_id: int = None, priority: int = PRIORITY_BACKGROUND, dedupe: bool = False) -> dict:
         """
         Método genérico para criar qualquer atividade.
+        Atividades são agendadas com prioridade de background no limitador de taxa.
+        Com `dedupe` (retry), uma atividade igual já existente no deal é reaproveitada.
         """
         data = {
             "subject": subject,
@@ -57,10 +131,40 @@ class PipedriveClient:
         if deal_id:
             data["deal_id"] = deal_id
 
+        # Retry de uma chamada que criou a atividade mas não teve resposta: reaproveita a existente
+        if deal_id and dedupe:
+            existing = self.find_open_activity(deal_id, type, subject, due_date, due_time)
+            if existing is False:
+                return None
+            if existing:
+                logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] Atividade já existente no Deal {deal_id}, reaproveitando")
+                return existing
+
         logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] 📅 Criando atividade no Pipedrive")
-        return self._post("activities", data)
+        return self._post("activities", data, priority=priority)
 
-    def schedule_confirmation_call(self, meeting_datetime: datetime, person_id: int, org_id: int, deal_id: int = None):
+    def find_open_activity(self, deal_id: int, type: str, subject: str, due_date: str, due_time: str):
+        """
+        Procura uma atividade em aberto do deal com mesmo tipo, assunto e horário.
+        Retorna a atividade, None se não houver, ou False se a consulta falhar.
+        """
+        start = 0
+        while True:
+            response = self._get(f"deals/{deal_id}/activities", params={"done": 0, "start": start, "limit": 100}, priority=PRIORITY_BACKGROUND)
+            if response is None:
+                return False
+
+            for activity in response.get("data") or []:
+                if (activity.get("type") == type and activity.get("subject") == subject
+                        and activity.get("due_date") == due_date and (activity.get("due_time") or "")[:5] == due_time):
+                    return activity
+
+            pagination = (response.get("additional_data") or {}).get("pagination") or {}
+            if not pagination.get("more_items_in_collection"):
+                return None
+            start = pagination.get("next_start", start + 100)
+
+    def schedule_confirmation_call(self, meeting_datetime: datetime, person_id: int, org_id: int, deal_id: int = None, dedupe: bool = False):
         """
         Cria ligação 1 dia antes as 10:00 BRT.
         Converte 10:00 BRT para UTC (13:00) antes de enviar.
@@ -89,10 +193,11 @@ class PipedriveClient:
             due_time=due_time,
             person_id=person_id,
             org_id=org_id,
-            deal_id=deal_id
+            deal_id=deal_id,
+            dedupe=dedupe,
         )
 
-    def schedule_meeting_activity(self, meeting_datetime: datetime, person_id: int, org_id: int, deal_id: int = None):
+    def schedule_meeting_activity(self, meeting_datetime: datetime, person_id: int, org_id: int, deal_id: int = None, dedupe: bool = False):
         """
         Cria a reunião no horário agendado.
         Converte o horário BRT para UTC antes de enviar.
@@ -119,13 +224,24 @@ class PipedriveClient:
             due_time=due_time,
             person_id=person_id,
             org_id=org_id,
-            deal_id=deal_id
+            deal_id=deal_id,
+            dedupe=dedupe,
         )
     
-    def _get(self, endpoint: str, params: dict = None):
+    def _request(self, method: str, url: str, endpoint: str, priority: int = PRIORITY_INTERACTIVE, **kwargs):
+        """Envia a requisição pelo transporte compartilhado; retorna None se nenhuma resposta chegar."""
+        try:
+            return self.transport.request(method, url, label=f"{method} {endpoint}", priority=priority, headers=self._get_headers(), **kwargs)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[PIPEDRIVE_CRM_INTEGRATION] Falha de rede em {method} {endpoint}: {e}")
+            return None
+
+    def _get(self, endpoint: str, params: dict = None, priority: int = PRIORITY_INTERACTIVE):
         """Método auxiliar para requisições GET"""
         url = f"{self.base_url}/{endpoint}?api_token={self.api_token}"
-        response = requests.get(url, params=params, headers=self._get_headers())
+        response = self._request("GET", url, endpoint, priority=priority, params=params)
+        if response is None:
+            return None
         
         if response.status_code == 200:
             return response.json()
@@ -133,13 +249,12 @@ class PipedriveClient:
             logger.error(f"[PIPEDRIVE_CRM_INTEGRATION] Erro ao buscar em {endpoint}: {response.text}")
             return None
     
-    def _post(self, endpoint: str, data: dict):
+    def _post(self, endpoint: str, data: dict, priority: int = PRIORITY_INTERACTIVE):
         """Método auxiliar para requisições POST"""
         url = f"{self.base_url}/{endpoint}?api_token={self.api_token}"
-        # print(f"Requisição POST para {url}.")
-        response = requests.post(url, json=data, headers=self._get_headers())
-
-        # print(response.json())
+        response = self._request("POST", url, endpoint, priority=priority, json=data)
+        if response is None:
+            return None
         
         if response.status_code == 201:
             return response.json()['data']
@@ -147,12 +262,14 @@ class PipedriveClient:
             logger.error(f"[PIPEDRIVE_CRM_INTEGRATION] Erro ao criar em {endpoint}: {response.text}")
             return None
 
-    def _put(self, endpoint: str, resource_id: int, data: dict):
+    def _put(self, endpoint: str, resource_id: int, data: dict, priority: int = PRIORITY_INTERACTIVE):
         """Método auxiliar para requisições PUT (Atualização)"""
         url = f"{self.base_url}/{endpoint}/{resource_id}?api_token={self.api_token}"
-        response = requests.put(url, json=data, headers=self._get_headers())
+        response = self._request("PUT", url, endpoint, priority=priority, json=data)
+        if response is None:
+            return None
 
-        logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] Requisição PUT para {url} com dados: {data}, resposta: {response.status_code} - {response.text}")
+        logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] Requisição PUT para {endpoint}/{resource_id} com dados: {data}, resposta: {response.status_code} - {response.text}")
         
         if response.status_code == 200:
             logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] Atualização realizada com sucesso no ID {resource_id}")
@@ -170,28 +287,86 @@ class PipedriveClient:
             "name": name,
             "owner_id": self.owner_id,
             "visible_to": self.visible_to,
-            # self.FIELD_MOTIVO_IA: motivo_ia
+            # self.field_registry.field_key("motivo_ia"): motivo_ia
         }
         
         logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] 🏢 Criando Organização no Pipedrive")
         return self._post("organizations", data)
     
-    def update_organization_details(self, url: str,org_id: int, segmento: str = None, faturamento: int = None, funcionarios: int = None, produto: str = None, desafio: list = None, momento: int = None):
+    def mutation_buffer(self) -> PipedriveMutationBuffer:
+        """Buffer que agrupa as mutações de um lead em um PUT por recurso."""
+        return PipedriveMutationBuffer(send=self._put)
+
+    def update_organization_details(self, url: str,org_id: int, segmento: str = None, faturamento: int = None, funcionarios: int = None, produto: str = None, desafio: list = None, momento: int = None, buffer: PipedriveMutationBuffer = None):
+        """
+        Atualiza os campos personalizados. Com `buffer`, apenas registra a mutação
+        para ser enviada no `buffer.flush()`.
+        """
         data = {}
 
-        if segmento: data[self.FIELD_SEGMENTO] = segmento
-        if faturamento: data[self.FIELD_FATURAMENTO] = faturamento
-        if funcionarios: data[self.FIELD_FUNCIONARIOS] = funcionarios
-        if produto: data[self.FIELD_PRODUTO] = produto
-        if desafio: data[self.FIELD_DESAFIO] = desafio
-        if momento: data[self.FIELD_MOMENTO] = momento
-        # if capacidade_investimento: data[self.FIELD_CAPACIDADE_INVESTIMENTO] = capacidade_investimento
+        fields = self.field_registry
+        if segmento: data[fields.field_key("segmento")] = segmento
+        if faturamento: data[fields.field_key("faturamento")] = faturamento
+        if funcionarios: data[fields.field_key("funcionarios")] = funcionarios
+        if produto: data[fields.field_key("produto")] = produto
+        if desafio: data[fields.field_key("desafio")] = desafio
+        if momento: data[fields.field_key("momento")] = momento
+        # if capacidade_investimento: data[fields.field_key("investimento")] = capacidade_investimento
 
         if not data: return None
 
+        if buffer is not None:
+            buffer.set_fields(url, org_id, data)
+            return data
+
         logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] Atualizando dados da Organização {org_id}...")
         return self._put(url, org_id, data)
 
+    def iter_deals(self, page_size: int = 500) -> Iterator[dict]:
+        """
+        Percorre todos os deals (exceto excluídos) em ordem de ID usando o cursor start/limit.
+        Apenas uma página fica em memória por vez.
+        """
+        start = 0
+        while True:
+            response = self._get("deals", params={
+                "start": start,
+                "limit": page_size,
+                "sort": "id ASC",
+                "status": "all_not_deleted",
+            }, priority=PRIORITY_BACKGROUND)
+
+            if response is None:
+                raise RuntimeError(f"Falha ao paginar deals do Pipedrive (start={start})")
+
+            for deal in response.get("data") or []:
+                yield deal
+
+            pagination = (response.get("additional_data") or {}).get("pagination") or {}
+            if not pagination.get("more_items_in_collection"):
+                return
+            start = pagination.get("next_start", start + page_size)
+
+    def _search_first_id(self, endpoint: str, term: str, field: str) -> Optional[int]:
+        response = self._get(endpoint, params={"term": term, "fields": field, "exact_match": "true", "limit": 1})
+        if not response:
+            return None
+
+        items = (response.get("data") or {}).get("items") or []
+        return items[0]["item"]["id"] if items else None
+
+    def search_organization(self, name: str) -> Optional[int]:
+        """Busca uma organização existente pelo nome exato."""
+        if not name:
+            return None
+        return self._search_first_id("organizations/search", name, "name")
+
+    def search_person(self, email: str) -> Optional[int]:
+        """Busca uma pessoa existente pelo e-mail exato."""
+        if not email:
+            return None
+        return self._search_first_id("persons/search", email, "email")
+
     def create_person(self, name: str, org_id: int, email: str = None, phone: str = None) -> dict:
         """
         Cria a pessoa (Lead) vinculada à Organização.
@@ -229,120 +404,71 @@ class PipedriveClient:
         logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] 💰 Criando Negócio no Pipedrive")
         return self._post("deals", data)
 
-    def update_deal_stage(self, deal_id: int, new_stage_id: int):
+    def update_deal_stage(self, deal_id: int, new_stage_id: int, buffer: PipedriveMutationBuffer = None):
         """
         Move o card para uma nova etapa do funil.
+        Com `buffer`, a mudança de etapa é mesclada às demais mutações do mesmo deal.
         """
         data = {
             "stage_id": new_stage_id
         }
+
+        if buffer is not None:
+            buffer.set_stage(deal_id, new_stage_id)
+            return data
+
         logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] 🚀 Movendo Deal {deal_id} para etapa {new_stage_id}...")
         return self._put("deals", deal_id, data)
+
+    def get_deal(self, deal_id: int) -> Optional[dict]:
+        response = self._get(f"deals/{deal_id}")
+        return (response or {}).get("data")
     
     def _get_pipedrive_option_id(self, category: str, value: str) -> int:
         """
         Traduz o texto do Front-end para o ID numérico do Pipedrive.
         """
-        if not value:
-            return None
-
-        # faturamento_map = {
-        #     "Até R$100 mil/ano": 27,
-        #     "R$100 mil a R$500 mil/ano": 28,
-        #     "R$500 mil a R$2 milhões/ano": 29,
-        #     "R$2 milhões/ano a R$10 milhões/ano": 30,
-        #     "Acima de R$10 milhões/ano": 31
-        # }
-
-        # funcionarios_map = {
-        #     "apenas eu": 32,
-        #     "1 a 5": 33,
-        #     "6 a 20": 34,
-        #     "21 a 50": 35,
-        #     "51 a 200": 36,
-        #     "+200": 37
-        # }
-
-        faturamento_map = {
-            "Até R$100 mil/ano": 173,
-            "R$100 mil a R$500 mil/ano": 174,
-            "R$500 mil a R$2 milhões/ano": 175,
-            "R$2 milhões/ano a R$10 milhões/ano": 176,
-            "Acima de R$10 milhões/ano": 177
-        }
-
-        funcionarios_map = {
-            "apenas eu": 178,
-            "1 a 5": 179,
-            "6 a 20": 180,
-            "21 a 50": 181,
-            "51 a 200": 182,
-            "+200": 183
-        }
-
-        desafio_map = {
-            "Consumo muitos tutoriais, mas não sei qual stack de ferramentas realmente gera lucro e escala.": 184,
-            "Tenho medo de fechar um contrato e não saber estruturar um fluxo que funcione no mundo real sem quebrar.": 185,
-            "Não sei como cobrar o valor justo ou demonstrar o ROI da solução de IA para o cliente.": 186,
-            "Sinto que o que eu faço qualquer um faz com o ChatGPT; preciso criar Agentes de Elite que resolvam problemas complexos.": 187,
-            "Não tenho um método para prospectar leads qualificados e dependo apenas de indicações esporádicas.": 188,
-            "Já vendo alguns projetos, mas a entrega consome todo o meu tempo e não consigo escalar meu faturamento.": 189
-        }
-
-        momento_map = {
-            "Trabalho em outra área, mas quero aproveitar o boom da IA para construir minha liberdade financeira e migrar de carreira.": 190,
-            "Já sou dono de agência (marketing, software, etc) e preciso integrar IA urgentemente para não perder mercado.": 191,
-            "Faço alguns freelas de automação, mas sinto que sou visto como um amador e quero me tornar uma referência de elite.": 192,
-            "Tenho facilidade técnica, mas percebi que preciso aprender a vender e gerir um negócio de IA para ganhar dinheiro de verdade.": 193,
-            "Sou sócio/gestor de uma empresa e quero aprender o método para implementar soluções internas e reduzir custos.": 194,
-            "Domino a técnica e quero estruturar meu conhecimento para ensinar outros, mas me falta o método de escala.": 195
-        }
-
-        investimento_map = {
-            "Entendo o valor de um método testado e o investimento está totalmente dentro do meu planejamento para crescer agora": 196,
-            "Tenho o capital, mas meu foco é validar como este acompanhamento vai acelerar meu ROI": 197,
-            "Tenho prioridade total em resolver isso, mas precisaria de opções de parcelamento": 198,
-            "Reconheço que preciso de ajuda, mas no momento não possuo recurso financeiro para investir em uma mentoria profissional.": 199
-        }
-
         try:
-            if category == "faturamento":
-                return faturamento_map.get(value)
-            elif category == "funcionarios":
-                return funcionarios_map.get(value)
-            elif category == "desafio":
-                return desafio_map.get(value)
-            elif category == "momento":
-                return momento_map.get(value)
-            elif category == "investimento":
-                return investimento_map.get(value)
+            return self.field_registry.option_id(category, value)
         except Exception as e:
             logger.error(f"[PIPEDRIVE_CRM_INTEGRATION] Erro ao mapear valor '{value}' para categoria '{category}': {e}")
             return None
-        
-        return None
 
-    def process_new_lead(self, company_name: str, lead_name: str, motivo_ia: str = "0a605b9668c110080cd956312ac51b11a7855621", email: str = None, phone: str = None) -> dict | None:
+    def process_new_lead(self, company_name: str, lead_name: str, motivo_ia: str = "0a605b9668c110080cd956312ac51b11a7855621", email: str = None, phone: str = None, org_id: int = None, person_id: int = None, deal_id: int = None, on_checkpoint: Callable[[str, int], None] = None) -> dict | None:
         """
         Função Mestra: Executa todo o fluxo em ordem.
         1. Cria Org -> 2. Cria Pessoa -> 3. Cria Deal
+
+        IDs já conhecidos (org_id/person_id/deal_id) pulam a etapa correspondente, e cada
+        ID criado é repassado a `on_checkpoint` assim que a etapa termina. Assim um retry
+        retoma da primeira etapa que falta, sem duplicar Org/Pessoa no CRM.
         """
+        def checkpoint(step: str, value: int):
+            if on_checkpoint:
+                on_checkpoint(step, value)
+
         # 1. Criar Organização
-        org = self.create_organization(company_name, motivo_ia)
-        if not org: return None
-        org_id = org['id']
+        if not org_id:
+            org = self.create_organization(company_name, motivo_ia)
+            if not org: return None
+            org_id = org['id']
+            checkpoint("org_id", org_id)
 
         # 2. Criar Pessoa
-        person = self.create_person(lead_name, org_id, email, phone)
-        if not person: return None
-        person_id = person['id']
+        if not person_id:
+            person = self.create_person(lead_name, org_id, email, phone)
+            if not person: return None
+            person_id = person['id']
+            checkpoint("person_id", person_id)
 
         # 3. Criar Deal
-        deal_title = f"{company_name} | {lead_name}"
-        
-        deal = self.create_deal(deal_title, person_id, org_id)
-        if not deal: return None
-        deal_id = deal['id']
+        if not deal_id:
+            deal_title = f"{company_name} | {lead_name}"
+            
+            deal = self.create_deal(deal_title, person_id, org_id)
+            if not deal: return None
+            deal_id = deal['id']
+            checkpoint("deal_id", deal_id)
 
         data_id = {
             "person_id": person_id,
@@ -350,8 +476,6 @@ class PipedriveClient:
             "deal_id": deal_id
         }
         
-        if deal:
-            logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] Fluxo completo! Deal ID: {deal['id']}")
-            return data_id
-        return None
+        logger.info(f"[PIPEDRIVE_CRM_INTEGRATION] Fluxo completo! Deal ID: {deal_id}")
+        return data_id
 
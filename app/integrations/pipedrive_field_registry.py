@@ -0,0 +1,195 @@
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional
+from app.utils.logging_config import logger
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", str(text)).strip().casefold()
+
+
+# Categoria -> (endpoint de metadados, nome do campo no Pipedrive, chave conhecida do campo)
+FIELD_SPECS = {
+    "segmento": ("organizationFields", "Segmento", "3bba6a3886d88fa043d916830d8e3fa63704b325"),
+    "faturamento": ("organizationFields", "Faturamento", "5dc337302075b541c01d5b4b43cdc18c6d069ac9"),
+    "funcionarios": ("organizationFields", "Funcionários", "d12a57b7469d8e92be6922544fb6534ca4ed1e21"),
+    "produto": ("organizationFields", "Produto", "675a446167008ae9d3aca7c95e57189b9199eb29"),
+    "motivo_ia": ("organizationFields", "Motivo IA", "0a605b9668c110080cd956312ac51b11a7855621"),
+    "desafio": ("dealFields", "Desafio", "5c6b52fb5611bf4d30e6a7a69499b23ea6c76b47"),
+    "momento": ("dealFields", "Momento", "33a533f719c6d40e15e3ccff84a36002ac6209c9"),
+    "investimento": ("dealFields", "Capacidade de investimento", "d6d6bd34a685a23f535f5de7170d343602ec59b3"),
+}
+
+# Opções conhecidas, usadas apenas enquanto os metadados do Pipedrive não puderem ser carregados
+FALLBACK_OPTIONS = {
+    "faturamento": {
+        "Até R$100 mil/ano": 173,
+        "R$100 mil a R$500 mil/ano": 174,
+        "R$500 mil a R$2 milhões/ano": 175,
+        "R$2 milhões/ano a R$10 milhões/ano": 176,
+        "Acima de R$10 milhões/ano": 177
+    },
+    "funcionarios": {
+        "apenas eu": 178,
+        "1 a 5": 179,
+        "6 a 20": 180,
+        "21 a 50": 181,
+        "51 a 200": 182,
+        "+200": 183
+    },
+    "desafio": {
+        "Consumo muitos tutoriais, mas não sei qual stack de ferramentas realmente gera lucro e escala.": 184,
+        "Tenho medo de fechar um contrato e não saber estruturar um fluxo que funcione no mundo real sem quebrar.": 185,
+        "Não sei como cobrar o valor justo ou demonstrar o ROI da solução de IA para o cliente.": 186,
+        "Sinto que o que eu faço qualquer um faz com o ChatGPT; preciso criar Agentes de Elite que resolvam problemas complexos.": 187,
+        "Não tenho um método para prospectar leads qualificados e dependo apenas de indicações esporádicas.": 188,
+        "Já vendo alguns projetos, mas a entrega consome todo o meu tempo e não consigo escalar meu faturamento.": 189
+    },
+    "momento": {
+        "Trabalho em outra área, mas quero aproveitar o boom da IA para construir minha liberdade financeira e migrar de carreira.": 190,
+        "Já sou dono de agência (marketing, software, etc) e preciso integrar IA urgentemente para não perder mercado.": 191,
+        "Faço alguns freelas de automação, mas sinto que sou visto como um amador e quero me tornar uma referência de elite.": 192,
+        "Tenho facilidade técnica, mas percebi que preciso aprender a vender e gerir um negócio de IA para ganhar dinheiro de verdade.": 193,
+        "Sou sócio/gestor de uma empresa e quero aprender o método para implementar soluções internas e reduzir custos.": 194,
+        "Domino a técnica e quero estruturar meu conhecimento para ensinar outros, mas me falta o método de escala.": 195
+    },
+    "investimento": {
+        "Entendo o valor de um método testado e o investimento está totalmente dentro do meu planejamento para crescer agora": 196,
+        "Tenho o capital, mas meu foco é validar como este acompanhamento vai acelerar meu ROI": 197,
+        "Tenho prioridade total em resolver isso, mas precisaria de opções de parcelamento": 198,
+        "Reconheço que preciso de ajuda, mas no momento não possuo recurso financeiro para investir em uma mentoria profissional.": 199
+    },
+}
+
+
+class PipedriveFieldRegistry:
+    """
+    Registro dos campos personalizados do Pipedrive (chaves e opções).
+
+    Carrega `organizationFields`/`dealFields` uma vez, monta índices reversos
+    label -> ID de opção e é recarregado após o TTL ou quando um label desconhecido
+    aparece. As consultas são O(1) em dicionários já montados.
+    """
+
+    def __init__(self, fetch: Callable[[str, dict], Optional[dict]]):
+        self.fetch = fetch
+        self.TTL = float(os.getenv("PIPEDRIVE_FIELDS_TTL", 3600))
+        self.MISS_REFRESH_INTERVAL = 60.0
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._last_miss_refresh = 0.0
+        self._keys: Dict[str, str] = {category: spec[2] for category, spec in FIELD_SPECS.items()}
+        self._options: Dict[str, Dict[str, int]] = self._build_option_index(FALLBACK_OPTIONS)
+
+    @staticmethod
+    def _build_option_index(options_by_category: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+        """Índice com o label original e o normalizado apontando para o mesmo ID."""
+        index = {}
+        for category, options in options_by_category.items():
+            entries = {}
+            for label, option_id in options.items():
+                entries[label] = option_id
+                entries[_normalize(label)] = option_id
+            index[category] = entries
+        return index
+
+    def _fetch_fields(self, endpoint: str) -> list:
+        fields, start = [], 0
+        while True:
+            response = self.fetch(endpoint, {"start": start, "limit": 500})
+            if not response or not response.get("success", True):
+                raise RuntimeError(f"Não foi possível carregar {endpoint}")
+
+            fields.extend(response.get("data") or [])
+            pagination = (response.get("additional_data") or {}).get("pagination") or {}
+            if not pagination.get("more_items_in_collection"):
+                return fields
+            start = pagination.get("next_start", start + 500)
+
+    def refresh(self) -> bool:
+        """Recarrega os metadados. Em caso de falha mantém o índice atual."""
+        try:
+            by_endpoint = {endpoint: self._fetch_fields(endpoint) for endpoint in {spec[0] for spec in FIELD_SPECS.values()}}
+        except Exception as e:
+            logger.error(f"[PIPEDRIVE_FIELD_REGISTRY] Erro ao carregar campos do Pipedrive: {e}")
+            with self._lock:
+                self._loaded_at = time.monotonic()
+            return False
+
+        keys, options = {}, {}
+        for category, (endpoint, field_name, fallback_key) in FIELD_SPECS.items():
+            fields = by_endpoint[endpoint]
+            # A chave é estável; o nome só é usado se o campo tiver sido recriado com outra chave
+            field = next((f for f in fields if f.get("key") == fallback_key), None)
+            field = field or next((f for f in fields if _normalize(f.get("name", "")) == _normalize(field_name)), None)
+
+            if not field:
+                logger.warning(f"[PIPEDRIVE_FIELD_REGISTRY] Campo '{field_name}' não encontrado em {endpoint}")
+                keys[category] = fallback_key
+                options[category] = FALLBACK_OPTIONS.get(category, {})
+                continue
+
+            keys[category] = field["key"]
+            options[category] = {option["label"]: option["id"] for option in field.get("options") or []}
+
+        index = self._build_option_index(options)
+        with self._lock:
+            self._keys = keys
+            self._options = index
+            self._loaded_at = time.monotonic()
+
+        logger.info("[PIPEDRIVE_FIELD_REGISTRY] Campos do Pipedrive carregados.")
+        return True
+
+    def _is_stale(self) -> bool:
+        return not self._loaded_at or time.monotonic() - self._loaded_at >= self.TTL
+
+    def _ensure_loaded(self):
+        if not self._is_stale():
+            return
+
+        # Só a primeira carga bloqueia; depois, quem não pegar o lock segue com o índice atual
+        if self._refresh_lock.acquire(blocking=not self._loaded_at):
+            try:
+                if self._is_stale():
+                    self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    def field_key(self, category: str) -> Optional[str]:
+        self._ensure_loaded()
+        return self._keys.get(category)
+
+    def option_id(self, category: str, label: str) -> Optional[int]:
+        if not label:
+            return None
+
+        self._ensure_loaded()
+        option_id = self._lookup(category, label)
+        if option_id is not None:
+            return option_id
+
+        # Label desconhecido: as opções podem ter mudado no CRM (recarrega no máximo 1x por intervalo)
+        now = time.monotonic()
+        with self._lock:
+            should_refresh = now - self._last_miss_refresh >= self.MISS_REFRESH_INTERVAL
+            if should_refresh:
+                self._last_miss_refresh = now
+
+        if should_refresh and self.refresh():
+            return self._lookup(category, label)
+        return None
+
+    def _lookup(self, category: str, label: str) -> Optional[int]:
+        options = self._options.get(category)
+        if not options:
+            return None
+
+        option_id = options.get(label)
+        if option_id is None:
+            option_id = options.get(_normalize(label))
+        return option_id
@@ -0,0 +1,41 @@
+from typing import Callable, Dict, Optional, Tuple
+from app.utils.logging_config import logger
+
+
+ResourceKey = Tuple[str, int]
+
+
+class PipedriveMutationBuffer:
+    """
+    Buffer de mutações de um lead durante uma chamada de serviço.
+
+    Atualizações de campos e mudanças de etapa destinadas ao mesmo recurso do Pipedrive
+    são mescladas e enviadas em um único PUT no `flush()`. Recursos diferentes (ex.:
+    organização e deal) continuam em PUTs separados; o chamador deve conferir o resultado.
+    """
+
+    def __init__(self, send: Callable[[str, int, Dict], Optional[dict]]):
+        self.send = send
+        self._mutations: Dict[ResourceKey, Dict] = {}
+
+    def set_fields(self, endpoint: str, resource_id: int, data: Dict):
+        if not resource_id or not data:
+            return
+        self._mutations.setdefault((endpoint, resource_id), {}).update(data)
+
+    def set_stage(self, deal_id: int, stage_id: int):
+        self.set_fields("deals", deal_id, {"stage_id": stage_id})
+
+    def flush(self) -> Dict[ResourceKey, Optional[dict]]:
+        """Envia as mutações pendentes. Retorna o resultado por recurso (None = falha)."""
+        mutations, self._mutations = self._mutations, {}
+        results = {}
+
+        for (endpoint, resource_id), data in mutations.items():
+            logger.info(f"[PIPEDRIVE_MUTATION_BUFFER] Enviando {len(data)} campo(s) em um único PUT para {endpoint}/{resource_id}")
+            result = self.send(endpoint, resource_id, data)
+            if result is None:
+                logger.error(f"[PIPEDRIVE_MUTATION_BUFFER] Pipedrive não confirmou o PUT de {len(data)} campo(s) em {endpoint}/{resource_id}")
+            results[(endpoint, resource_id)] = result
+
+        return results
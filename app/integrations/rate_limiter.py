@@ -0,0 +1,92 @@
+import threading
+import time
+from app.utils.logging_config import logger
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket compartilhado pelas threads do processo.
+
+    Se adapta aos headers `x-ratelimit-remaining`/`x-ratelimit-reset` devolvidos pela API
+    e dá preferência às chamadas interativas: chamadas de background só consomem tokens
+    acima de uma reserva e cedem a vez sempre que há uma interativa esperando.
+    """
+
+    def __init__(self, name: str, rate_per_second: float, capacity: int, background_reserve: float = 0.25):
+        self.name = name
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.background_reserve = max(1.0, capacity * background_reserve)
+
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting_interactive = 0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: float = 60) -> bool:
+        """Aguarda um token. Retorna False se o tempo limite estourar."""
+        deadline = time.monotonic() + timeout
+        interactive = priority == PRIORITY_INTERACTIVE
+
+        with self._cond:
+            if interactive:
+                self._waiting_interactive += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    threshold = 1.0 if interactive else 1.0 + self.background_reserve
+                    can_take = now >= self._blocked_until and self._tokens >= threshold
+                    if not interactive and self._waiting_interactive:
+                        can_take = False
+
+                    if can_take:
+                        self._tokens -= 1
+                        return True
+
+                    if now >= deadline:
+                        logger.warning(f"[{self.name}] Sem orçamento de requisições disponível (prioridade {priority})")
+                        return False
+
+                    wait = max(self._blocked_until - now, (threshold - self._tokens) / self.rate, 0.01)
+                    self._cond.wait(min(wait, deadline - now))
+            finally:
+                if interactive:
+                    self._waiting_interactive -= 1
+                    self._cond.notify_all()
+
+    def observe(self, status_code: int, headers) -> None:
+        """Ajusta o bucket ao orçamento real informado pela API."""
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+
+            try:
+                if remaining is not None:
+                    self._tokens = min(self._tokens, float(remaining))
+
+                if reset is not None and (status_code == 429 or (remaining is not None and float(remaining) <= 0)):
+                    reset_seconds = float(reset)
+                    # Alguns endpoints devolvem epoch em vez de segundos restantes
+                    if reset_seconds > 1_000_000_000:
+                        reset_seconds = max(0.0, reset_seconds - time.time())
+                    self._blocked_until = max(self._blocked_until, now + reset_seconds)
+                    self._tokens = 0.0
+                    logger.warning(f"[{self.name}] Limite de requisições atingido, pausando por {reset_seconds:.1f}s")
+            except ValueError:
+                pass
+
+            self._cond.notify_all()
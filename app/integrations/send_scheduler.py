@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from app.interfaces.repositories.send_slot_repository_interface import SendSlotRepositoryInterface
+
+
+class SendDeferred(Exception):
+    """Não há vaga de envio dentro do horizonte: a mensagem deve ficar para o próximo ciclo."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SendScheduler:
+    """
+    Agenda de envios de uma instância (ex.: número de WhatsApp).
+
+    Garante no máximo `per_minute` envios em qualquer janela de 60s e um espaçamento
+    mínimo entre envios. `reserve` devolve quanto esperar pela vaga reservada; se a
+    vaga cair além do horizonte, levanta SendDeferred em vez de bloquear.
+
+    Com `store` as vagas são reservadas no Mongo e o
+    orçamento vale para todos os processos; os envios ficam espaçados em
+    max(min_interval, 60s / per_minute), o que respeita o mesmo limite por janela.
+    Sem `store`, a agenda é local ao processo.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, name: str, per_minute: int, min_interval: float, horizon: float, store: SendSlotRepositoryInterface = None, key: str = None):
+        self.name = name
+        self.per_minute = max(1, per_minute)
+        self.min_interval = max(0.0, min_interval)
+        self.horizon = horizon
+        self.store = store
+        self.key = key or name
+
+        self._slots = deque()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.store is not None:
+            return self._reserve_shared()
+
+        with self._lock:
+            now = time.monotonic()
+            while self._slots and self._slots[0] <= now - self.WINDOW:
+                self._slots.popleft()
+
+            slot = now
+            if self._slots:
+                slot = max(slot, self._slots[-1] + self.min_interval)
+            if len(self._slots) >= self.per_minute:
+                slot = max(slot, self._slots[-self.per_minute] + self.WINDOW)
+
+            wait = slot - now
+            if wait > self.horizon:
+                raise SendDeferred(f"{self.name}: orçamento de envios esgotado", retry_after=wait)
+
+            self._slots.append(slot)
+            return wait
+
+    def _reserve_shared(self) -> float:
+        interval = max(self.min_interval, self.WINDOW / self.per_minute)
+        reserved, slot_at = self.store.reserve(self.key, timedelta(seconds=interval), timedelta(seconds=self.horizon))
+
+        wait = max(0.0, (slot_at - datetime.utcnow()).total_seconds())
+        if not reserved:
+            raise SendDeferred(f"{self.name}: orçamento de envios esgotado", retry_after=max(wait, interval))
+        return wait
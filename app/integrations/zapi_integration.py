@@ -1,19 +1,81 @@
 import os
 import re
+import threading
 import time
+from typing import Optional
 from dotenv import load_dotenv
 import requests
+from urllib3.exceptions import NewConnectionError
+from app.integrations.circuit_breaker import CircuitBreaker
+from app.integrations.http_transport import HttpTransport
+from app.integrations.send_scheduler import SendDeferred, SendScheduler
+from app.interfaces.repositories.send_slot_repository_interface import SendSlotRepositoryInterface
 from app.utils.logging_config import logger
 
 
 load_dotenv()
 
+# Transporte compartilhado pelo processo (pool keep-alive, timeouts e backoff com jitter)
+_zapi_transport = HttpTransport(
+    "ZAPI_INTEGRATION",
+    pool_maxsize=int(os.getenv("CRON_MAX_WORKERS", 8)),
+    connect_timeout=float(os.getenv("ZAPI_CONNECT_TIMEOUT", 3.05)),
+    read_timeout=float(os.getenv("ZAPI_READ_TIMEOUT", 10)),
+    max_retries=int(os.getenv("ZAPI_MAX_RETRIES", 2)),
+)
+
+# Disjuntor compartilhado: com a Z-API degradada, os envios restantes falham sem tocar na rede
+_zapi_breaker = CircuitBreaker(
+    "ZAPI_INTEGRATION",
+    failure_threshold=int(os.getenv("ZAPI_BREAKER_THRESHOLD", 5)),
+    reset_timeout=float(os.getenv("ZAPI_BREAKER_RESET_SECONDS", 60)),
+)
+
+# Ritmo de envio por instância da Z-API (um número de WhatsApp não deve disparar em rajada)
+_zapi_schedulers = {}
+_zapi_schedulers_lock = threading.Lock()
+
+
+def get_send_scheduler(instance_id: str, store: SendSlotRepositoryInterface = None) -> SendScheduler:
+    """Agenda da instância; com `store` o orçamento é compartilhado por todos os processos."""
+    with _zapi_schedulers_lock:
+        scheduler = _zapi_schedulers.get((instance_id, store is not None))
+        if scheduler is None:
+            scheduler = SendScheduler(
+                f"ZAPI_INTEGRATION:{instance_id}",
+                per_minute=int(os.getenv("ZAPI_MESSAGES_PER_MINUTE", 20)),
+                min_interval=float(os.getenv("ZAPI_MIN_SEND_INTERVAL", 2)),
+                horizon=float(os.getenv("ZAPI_SEND_HORIZON_SECONDS", 20)),
+                store=store,
+                key=f"zapi:{instance_id}",
+            )
+            _zapi_schedulers[(instance_id, store is not None)] = scheduler
+        return scheduler
+
+class PermanentSendError(Exception):
+    """A Z-API recusou a mensagem (telefone/payload/credencial): repetir não adianta."""
+    pass
+
+
+class AmbiguousSendError(Exception):
+    """A requisição pode ter chegado à Z-API (timeout de leitura, 500/502/504): reenviar pode duplicar."""
+    pass
+
+
 class ZAPIClient:
-    def __init__(self):
+    # Falhas de disponibilidade (contam para o disjuntor); os demais 4xx são permanentes
+    RETRYABLE_STATUSES = (408, 429, 500, 502, 503, 504)
+    # Respostas em que a Z-API comprovadamente não processou o envio: seguro repetir
+    NOT_PROCESSED_STATUSES = (408, 429, 503)
+
+    def __init__(self, send_slot_repository: SendSlotRepositoryInterface = None):
+        self.transport = _zapi_transport
+        self.breaker = _zapi_breaker
         self.base_url = os.getenv("ZAPI_BASE_URL")
         self.instance_id = os.getenv("ZAPI_INSTANCE_ID")
         self.instance_token = os.getenv("ZAPI_INSTANCE_TOKEN")
         self.client_token = os.getenv("ZAPI_CLIENT_TOKEN")
+        self.scheduler = get_send_scheduler(self.instance_id, send_slot_repository)
         
         # Headers padrão
         self.headers = {
@@ -51,44 +113,93 @@ class ZAPIClient:
         return clean_phone
 
     def send_message(self, phone: str, message: str) -> bool:
-        """Envia uma mensagem de texto simples com retry logic."""
-        
+        """Envia uma mensagem de texto simples. Retorna True se a Z-API aceitou o envio."""
+        try:
+            return self.send_text(phone, message) is not None
+        except (PermanentSendError, AmbiguousSendError):
+            return False
+
+    def send_text(self, phone: str, message: str) -> Optional[dict]:
+        """
+        Envia uma mensagem de texto e retorna {"message_id", "latency_ms"}, ou None quando a
+        mensagem comprovadamente não chegou à Z-API (seguro tentar de novo).
+
+        Retry com backoff fica a cargo do transporte. Levanta PermanentSendError quando
+        repetir não adianta, AmbiguousSendError quando a mensagem pode ter sido entregue,
+        CircuitOpenError quando a Z-API está indisponível, para que o chamador interrompa
+        os envios restantes, e SendDeferred quando o ritmo da instância não comporta o envio agora.
+        """
+
         # 1. Validações
         target_phone = self._format_phone(phone)
         if not target_phone:
-            logger.warning("[ZAPI_INTEGRATION] Falha: Telefone inválido.")
-            return False
+            raise PermanentSendError("Telefone inválido")
 
         if not message or not isinstance(message, str):
-            logger.warning("[ZAPI_INTEGRATION] Falha: Mensagem vazia ou inválida.")
-            return False
+            raise PermanentSendError("Mensagem vazia ou inválida")
 
         # 2. Preparação
         url = self._get_api_url("send-text")
-        
+
         payload = {
             "phone": target_phone,
             "message": message,
         }
 
-        # print(f"[Z-API] Enviando para {url} com payload: {payload}")
+        # 3. Disjuntor primeiro: com o circuito aberto o envio não consome vaga do orçamento compartilhado
+        self.breaker.before_call()
 
+        # 4. Ritmo: espera a vaga reservada (dentro do horizonte) ou adia para o próximo ciclo
+        try:
+            wait = self.scheduler.reserve()
+        except SendDeferred:
+            self.breaker.abandon_call()
+            raise
+        if wait > 0:
+            time.sleep(wait)
 
-        # 3. Envio com Retry (3 tentativas)
-        max_attempts = 3
-        for attempt in range(1, max_attempts + 1):
-            try:
-                logger.info(f"[ZAPI_INTEGRATION] Enviando para mensagem para contato (Tentativa {attempt})...")
-                
-                response = requests.post(url, json=payload, headers=self.headers, timeout=10)
-                response.raise_for_status() # Levanta erro se status code for 4xx ou 5xx
+        # 5. Envio
+        started = time.perf_counter()
 
-                logger.info(f"[ZAPI_INTEGRATION] Status: {response.status_code} Resposta: {response.text}")
+        try:
+            response = self.transport.request("POST", url, label="POST send-text", json=payload, headers=self.headers)
+        except requests.exceptions.RequestException as e:
+            self.breaker.record_failure()
+            logger.error(f"[ZAPI_INTEGRATION] Falha de rede ao enviar mensagem: {e}")
+            if self._never_reached_server(e):
+                return None
+            raise AmbiguousSendError(f"Sem resposta da Z-API após o envio: {e}")
 
-                return True
+        latency_ms = (time.perf_counter() - started) * 1000
 
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"[ZAPI_INTEGRATION] Falha definitiva ao enviar para {target_phone}. Erro: {e}")
-                continue
-        
-        return False
\ No newline at end of file
+        if response.status_code < 400:
+            self.breaker.record_success()
+            logger.info(f"[ZAPI_INTEGRATION] Status: {response.status_code} Resposta: {response.text}")
+
+            try:
+                data = response.json() or {}
+            except ValueError:
+                data = {}
+            return {"message_id": data.get("messageId") or data.get("id"), "latency_ms": latency_ms}
+
+        if response.status_code in self.RETRYABLE_STATUSES:
+            self.breaker.record_failure()
+            logger.error(f"[ZAPI_INTEGRATION] Z-API indisponível ({response.status_code}): {response.text}")
+            if response.status_code in self.NOT_PROCESSED_STATUSES:
+                return None
+            raise AmbiguousSendError(f"Z-API respondeu {response.status_code}; o envio pode ter ocorrido")
+
+        # Erro permanente (payload/telefone/credencial): a Z-API respondeu, então não abre o circuito
+        self.breaker.record_success()
+        logger.error(f"[ZAPI_INTEGRATION] Falha definitiva ao enviar mensagem ({response.status_code}): {response.text}")
+        raise PermanentSendError(f"Z-API recusou o envio ({response.status_code})")
+
+    @staticmethod
+    def _never_reached_server(error: requests.exceptions.RequestException) -> bool:
+        """Timeout de conexão ou conexão recusada/DNS: a requisição não saiu do cliente."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(error, requests.exceptions.ConnectionError):
+            reason = getattr(error.args[0], "reason", None) if error.args else None
+            return isinstance(reason, NewConnectionError)
+        return False
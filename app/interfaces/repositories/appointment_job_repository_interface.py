@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.models.tables.appointment_job_model import AppointmentJob
+
+
+class AppointmentJobRepositoryInterface(ABC):
+
+    @abstractmethod
+    def create(self, job: AppointmentJob) -> AppointmentJob:
+        pass
+
+    @abstractmethod
+    def claim_next(self, lease_until: datetime) -> Optional[AppointmentJob]:
+        pass
+
+    @abstractmethod
+    def update_fields(self, job_id, data: Dict) -> bool:
+        pass
+
+    @abstractmethod
+    def cancel_others(self, lead_id: str, keep_job_id) -> List[AppointmentJob]:
+        pass
+
+    @abstractmethod
+    def find_latest_by_lead(self, lead_id: str) -> Optional[AppointmentJob]:
+        pass
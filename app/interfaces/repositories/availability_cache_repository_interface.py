@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.models.tables.availability_cache_model import AvailabilityCacheEntry
+
+
+class AvailabilityCacheRepositoryInterface(ABC):
+
+    @abstractmethod
+    def find_by_key(self, key: str) -> Optional[AvailabilityCacheEntry]:
+        pass
+
+    @abstractmethod
+    def save(self, key: str, payload: List[Dict], fresh_until: datetime, expires_at: datetime, generation: int) -> bool:
+        pass
+
+    @abstractmethod
+    def try_acquire_refresh(self, key: str, lease_until: datetime) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def release_refresh(self, key: str, failed_until: datetime) -> None:
+        pass
+
+    @abstractmethod
+    def invalidate_all(self) -> None:
+        pass
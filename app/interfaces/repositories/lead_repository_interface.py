@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, List
-from app.models.tables.lead_model import Lead
+from datetime import datetime
+from typing import Dict, Iterator, Optional, List
+from app.models.tables.lead_model import CronLeadView, Lead
 
 
 class LeadRepositoryInterface(ABC):
@@ -21,6 +22,10 @@ class LeadRepositoryInterface(ABC):
     def find_by_token(self, token: str) -> Optional[Lead]:
         pass
 
+    @abstractmethod
+    def find_by_id(self, lead_id: str) -> Optional[Lead]:
+        pass
+
     @abstractmethod
     def list_all(self) -> List[Lead]:
         pass
@@ -30,14 +35,50 @@ class LeadRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def find_pending_confirmations(self) -> List["Lead"]:
+    def clear_scheduling_day_if(self, lead_id, scheduling_day: datetime) -> bool:
+        pass
+
+    @abstractmethod
+    def claim_crm_sync(self, lease_until: datetime, lead_id=None) -> Optional[Lead]:
+        pass
+
+    @abstractmethod
+    def save_crm_checkpoint(self, lead_id, step: str, value: int) -> None:
+        pass
+
+    @abstractmethod
+    def complete_crm_sync(self, lead_id, person_id: int, org_id: int, deal_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def fail_crm_sync(self, lead_id, attempts: int, next_attempt_at: datetime, error: str, final: bool) -> None:
+        pass
+
+    @abstractmethod
+    def update_deal_mirror(self, deal_id: int, stage_id: Optional[int], status: Optional[str], event_at: Optional[datetime] = None) -> int:
+        pass
+
+    @abstractmethod
+    def stream_deal_links(self, batch_size: int = 500) -> Iterator[Dict]:
+        pass
+
+    @abstractmethod
+    def bulk_set(self, updates: List[tuple]) -> int:
+        pass
+
+    @abstractmethod
+    def bulk_set_if(self, updates: List[tuple]) -> int:
+        pass
+
+    @abstractmethod
+    def find_due_actions(self, now: datetime, batch_size: int = 500) -> Iterator[CronLeadView]:
         pass
 
     @abstractmethod
-    def find_abandoned_leads(self) -> List["Lead"]:
+    def stream_all_views(self, batch_size: int = 500) -> Iterator[CronLeadView]:
         pass
 
     @abstractmethod
-    def find_upcoming_meetings(self) -> List["Lead"]:
+    def claim_cron_job(self, lead_id, job: str, claimed_before: datetime) -> bool:
         pass
 
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Optional
+from app.models.tables.outbound_message_model import OutboundMessage
+
+
+class OutboundMessageRepositoryInterface(ABC):
+
+    @abstractmethod
+    def enqueue(self, message: OutboundMessage) -> bool:
+        pass
+
+    @abstractmethod
+    def claim_next(self, lease_until: datetime) -> Optional[OutboundMessage]:
+        pass
+
+    @abstractmethod
+    def update_fields(self, message_id, data: Dict) -> None:
+        pass
@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class PipedriveEntityRepositoryInterface(ABC):
+
+    @abstractmethod
+    def find_id(self, kind: str, lookup_key: str) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def save_id(self, kind: str, lookup_key: str, pipedrive_id: int) -> None:
+        pass
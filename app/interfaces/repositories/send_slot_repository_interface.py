@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Tuple
+
+
+class SendSlotRepositoryInterface(ABC):
+
+    @abstractmethod
+    def reserve(self, key: str, interval: timedelta, horizon: timedelta) -> Tuple[bool, datetime]:
+        pass
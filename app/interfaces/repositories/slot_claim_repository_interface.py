@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+
+class SlotClaimRepositoryInterface(ABC):
+
+    @abstractmethod
+    def claim(self, calendar_id: str, slot_start: datetime, lead_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def release(self, calendar_id: str, slot_start: datetime, lead_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def release_others(self, calendar_id: str, lead_id: str, keep_slot_start: datetime) -> int:
+        pass
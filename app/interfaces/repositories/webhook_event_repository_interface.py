@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+
+
+class WebhookEventRepositoryInterface(ABC):
+
+    @abstractmethod
+    def register(self, source: str, event_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def unregister(self, source: str, event_id: str) -> None:
+        pass
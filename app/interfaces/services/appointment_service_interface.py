@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 class AppointmentServiceInterface(ABC):
@@ -9,5 +9,9 @@ class AppointmentServiceInterface(ABC):
         pass
 
     @abstractmethod
-    def list_busy_slots(self) -> List[Dict]:
+    def list_busy_slots(self, date_from: Optional[str] = None, date_to: Optional[str] = None, week: Optional[str] = None) -> List[Dict]:
+        pass
+
+    @abstractmethod
+    def get_appointment_status(self, lead_token: str) -> Dict:
         pass
\ No newline at end of file
@@ -1,15 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict
 
 class CronJobServiceInterface(ABC):
     @abstractmethod
-    def send_confirmation_messager(self) -> List[Dict]:
+    def enqueue_due_actions(self) -> Dict[str, int]:
         pass
 
     @abstractmethod
-    def send_recovery_message(self) -> List[Dict]:
+    def run_all(self) -> Dict[str, str]:
         pass
 
     @abstractmethod
-    def send_meeting_reminder(self) -> List[Dict]:
-        pass
\ No newline at end of file
+    def refresh_next_actions(self) -> int:
+        pass
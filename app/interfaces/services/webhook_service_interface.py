@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+from typing import Dict
+
+
+class WebhookServiceInterface(ABC):
+
+    @abstractmethod
+    def handle_pipedrive_event(self, payload: Dict, raw_body: bytes) -> Dict:
+        pass
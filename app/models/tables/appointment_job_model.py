@@ -0,0 +1,57 @@
+from mongoengine import Document, StringField, DateTimeField, IntField, DictField
+from datetime import datetime
+
+
+class AppointmentJob(Document):
+    """
+    Registro durável da finalização de um agendamento (Google Calendar + Pipedrive).
+    Cada etapa guarda seu próprio status/tentativas para que o worker retome de onde parou.
+    """
+    meta = {
+        "collection": "appointment_jobs",
+        "strict": False,
+        "indexes": [
+            ("status", "next_attempt_at"),
+            "lead_id",
+        ]
+    }
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    # Substituído por um novo agendamento do mesmo lead
+    STATUS_CANCELLED = "cancelled"
+
+    lead_id = StringField(required=True)
+    start_time = DateTimeField(required=True)
+    summary = StringField()
+    description = StringField()
+
+    status = StringField(default=STATUS_PENDING, choices=(STATUS_PENDING, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED))
+    steps = DictField()
+    attempts = IntField(default=0)
+    last_error = StringField()
+
+    event_id = StringField()
+    meet_link = StringField()
+
+    next_attempt_at = DateTimeField(default=datetime.utcnow)
+    locked_until = DateTimeField()
+
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+    @property
+    def calendar_event_id(self) -> str:
+        """ID determinístico do evento no Google (base32hex): o retry não duplica o evento."""
+        return f"appt{self.id}"
+
+    def to_status_dict(self) -> dict:
+        return {
+            "job_id": str(self.id),
+            "status": self.status,
+            "meet_link": self.meet_link,
+            "event_id": self.event_id,
+            "steps": {name: step.get("status") for name, step in (self.steps or {}).items()},
+        }
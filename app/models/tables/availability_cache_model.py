@@ -0,0 +1,28 @@
+from mongoengine import Document, StringField, DateTimeField, ListField, DictField, IntField
+from datetime import datetime
+
+
+class AvailabilityCacheEntry(Document):
+    """Cópia compartilhada (entre workers) da disponibilidade calculada da agenda."""
+    meta = {
+        "collection": "availability_cache",
+        "strict": False,
+        "indexes": [
+            {"fields": ["key"], "unique": True},
+            # TTL: o Mongo remove o documento quando a cópia "stale" também expira
+            {"fields": ["expires_at"], "expireAfterSeconds": 0},
+        ]
+    }
+
+    key = StringField(required=True)
+    payload = ListField(DictField())
+
+    fresh_until = DateTimeField(required=True)
+    expires_at = DateTimeField(required=True)
+    refreshing_until = DateTimeField()
+    # Cache negativo: a última consulta falhou, evita que todos os workers repitam a chamada
+    failed_until = DateTimeField()
+    # Avança a cada invalidação: uma carga só grava se a geração não mudou desde o lease
+    generation = IntField(default=0)
+
+    updated_at = DateTimeField(default=datetime.utcnow)
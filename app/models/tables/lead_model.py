@@ -1,6 +1,7 @@
 from mongoengine import Document, EmbeddedDocument, StringField, DateTimeField, IntField, BooleanField, EmbeddedDocumentField, ListField
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from pymongo import ReturnDocument, UpdateOne
 
 class LeadFollowupData(EmbeddedDocument):
     """Dados vindos do formulário de Consultoria/Followup"""
@@ -16,6 +17,35 @@ class SalesLeadData(EmbeddedDocument):
     product_of_interest = StringField()
     collaborators = StringField()
 
+class CrmSyncOutbox(EmbeddedDocument):
+    """Entrada de outbox gravada junto com o lead: sincronização pendente com o Pipedrive"""
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    status = StringField(default=STATUS_PENDING, choices=(STATUS_PENDING, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED))
+    attempts = IntField(default=0)
+    next_attempt_at = DateTimeField(default=datetime.utcnow)
+    locked_until = DateTimeField()
+    last_error = StringField()
+
+class CronLeadView:
+    """Projeção leve do lead lida pelos jobs do cron, montada direto do cursor (sem Document)."""
+    FIELDS = (
+        "name", "phone", "type_lead", "meet_link", "scheduling_day", "booked_at", "created_at", "updated_at",
+        "confirmation_sent", "recovery_sent", "reminder_sent",
+        "confirmation_claimed_at", "recovery_claimed_at", "reminder_claimed_at",
+        "next_action_at", "next_action_kind",
+    )
+    __slots__ = ("id",) + FIELDS
+
+    def __init__(self, raw: Dict):
+        self.id = raw["_id"]
+        for field in self.FIELDS:
+            setattr(self, field, raw.get(field))
+
+
 # 2. O Documento Principal
 class Lead(Document):
     meta = {
@@ -25,7 +55,12 @@ class Lead(Document):
             "phone",
             "email",
             "scheduling_day",
-            "confirmation_sent"
+            "confirmation_sent",
+            ("crm_sync.status", "crm_sync.next_attempt_at"),
+            "id_deal_pipedrive",
+            "deal_stage_id",
+            # Varredura única do cron (next_action_at <= agora)
+            "next_action_at",
         ]
     }
 
@@ -36,17 +71,32 @@ class Lead(Document):
     meet_link = StringField()
     
     scheduling_day = DateTimeField()
+    booked_at = DateTimeField()
     leadtoken = StringField()
     
     id_person_pipedrive = IntField()
     id_organization_pipedrive = IntField()
     id_deal_pipedrive = IntField()
+
+    # Espelho da etapa/status do deal, atualizado pelo webhook do Pipedrive
+    deal_stage_id = IntField()
+    deal_status = StringField()
+    deal_synced_at = DateTimeField()
     
     type_lead = StringField(required=True, choices=('consultoria', 'venda'))
 
     confirmation_sent = BooleanField(default=False)
     recovery_sent = BooleanField(default=False)
     reminder_sent = BooleanField(default=False)
+
+    # Claims do cron por job: impedem que execuções concorrentes processem o mesmo lead
+    confirmation_claimed_at = DateTimeField()
+    recovery_claimed_at = DateTimeField()
+    reminder_claimed_at = DateTimeField()
+
+    # Próxima mensagem de follow-up e quando ela vence (recalculado a cada save)
+    next_action_at = DateTimeField()
+    next_action_kind = StringField()
     
     created_at = DateTimeField(default=datetime.now)
     updated_at = DateTimeField(default=datetime.now)
@@ -54,12 +104,66 @@ class Lead(Document):
     followup_data = EmbeddedDocumentField(LeadFollowupData)
     sales_data = EmbeddedDocumentField(SalesLeadData)
 
+    crm_sync = EmbeddedDocumentField(CrmSyncOutbox)
+
+    # Regras de tempo dos follow-ups
+    DELAY_CONFIRMATION = timedelta(hours=1)
+    DELAY_RECOVERY = timedelta(hours=1)
+    REMINDER_WINDOW = (timedelta(minutes=50), timedelta(minutes=70))
+
+    ACTION_CONFIRMATION = "confirmation"
+    ACTION_RECOVERY = "recovery"
+    ACTION_REMINDER = "reminder"
+
     def save(self, *args, **kwargs):
         if not self.created_at:
             self.created_at = datetime.now()
         self.updated_at = datetime.now()
+
+        changed = self._get_changed_fields() if self.pk else []
+        if self.scheduling_day and (not self.booked_at or "scheduling_day" in changed):
+            self.booked_at = datetime.now()
+
+        self.next_action_at, self.next_action_kind = self.compute_next_action(self)
         return super().save(*args, **kwargs)
 
+    @staticmethod
+    def to_utc_naive(dt: Optional[datetime]) -> Optional[datetime]:
+        """Datetime naive em UTC (valores naive do banco já são UTC)."""
+        if dt is None or dt.tzinfo is None:
+            return dt
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+    @classmethod
+    def compute_next_action(cls, lead, now: datetime = None) -> Tuple[Optional[datetime], Optional[str]]:
+        """
+        Próximo follow-up pendente do lead (Lead ou CronLeadView) e quando ele vence.
+        Um tipo conta como resolvido quando a mensagem foi enviada ou já está na fila (claim).
+        O lembrete só vale até o fim da janela; depois disso deixa de ser candidato.
+        """
+        now = cls.to_utc_naive(now) or datetime.utcnow()
+
+        def pending(kind: str) -> bool:
+            return not getattr(lead, f"{kind}_sent", False) and not getattr(lead, f"{kind}_claimed_at", None)
+
+        candidates = []
+        scheduling_day = cls.to_utc_naive(lead.scheduling_day)
+
+        if scheduling_day is None:
+            if pending(cls.ACTION_RECOVERY) and lead.created_at:
+                candidates.append((cls.to_utc_naive(lead.created_at) + cls.DELAY_RECOVERY, cls.ACTION_RECOVERY))
+        else:
+            if pending(cls.ACTION_CONFIRMATION):
+                booked_at = cls.to_utc_naive(lead.booked_at or lead.updated_at or lead.created_at)
+                candidates.append((booked_at + cls.DELAY_CONFIRMATION, cls.ACTION_CONFIRMATION))
+
+            if pending(cls.ACTION_REMINDER) and now <= scheduling_day - cls.REMINDER_WINDOW[0]:
+                candidates.append((scheduling_day - cls.REMINDER_WINDOW[1], cls.ACTION_REMINDER))
+
+        if not candidates:
+            return None, None
+        return min(candidates)
+
     @classmethod
     def update_by_phone(cls, lead_phone: str, data: Dict) -> "Lead":
         lead = cls.objects(phone=lead_phone).first()
@@ -88,21 +192,171 @@ class Lead(Document):
         return lead
 
     @classmethod
-    def find_pending_confirmations(cls) -> List["Lead"]:
-        """Leads com agendamento marcado mas sem confirmação enviada."""
-        return cls.objects(scheduling_day__ne=None, confirmation_sent=False)
+    def clear_scheduling_day_if(cls, lead_id, scheduling_day: datetime) -> bool:
+        """
+        Remove o agendamento apenas se o lead ainda estiver marcado para `scheduling_day` (UTC).
+        next_action_at vence na hora para que o cron recalcule o follow-up. Retorna se alterou.
+        """
+        result = cls._get_collection().update_one(
+            {"_id": lead_id, "scheduling_day": scheduling_day},
+            {"$set": {"scheduling_day": None, "next_action_at": datetime.utcnow()}},
+        )
+        return result.modified_count == 1
 
     @classmethod
-    def find_abandoned_leads(cls) -> List["Lead"]:
-        """Leads sem agendamento e sem recuperação enviada."""
-        return cls.objects(scheduling_day=None, recovery_sent=False)
+    def claim_crm_sync(cls, lease_until: datetime, lead_id=None) -> Optional["Lead"]:
+        """Pega atomicamente um lead com sincronização de CRM vencida (ou com lease expirado)."""
+        now = datetime.utcnow()
+        query = {
+            "$or": [
+                {"crm_sync.status": CrmSyncOutbox.STATUS_PENDING, "crm_sync.next_attempt_at": {"$lte": now}},
+                {"crm_sync.status": CrmSyncOutbox.STATUS_RUNNING, "crm_sync.locked_until": {"$lt": now}},
+            ]
+        }
+        if lead_id is not None:
+            query["_id"] = lead_id
+
+        raw = cls._get_collection().find_one_and_update(
+            query,
+            {"$set": {"crm_sync.status": CrmSyncOutbox.STATUS_RUNNING, "crm_sync.locked_until": lease_until}},
+            sort=[("crm_sync.next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return cls._from_son(raw) if raw else None
+
+    CRM_CHECKPOINT_FIELDS = {
+        "org_id": "id_organization_pipedrive",
+        "person_id": "id_person_pipedrive",
+        "deal_id": "id_deal_pipedrive",
+    }
 
     @classmethod
-    def find_upcoming_meetings(cls) -> List["Lead"]:
-        """Leads agendados sem lembrete enviado."""
-        return cls.objects(scheduling_day__ne=None, reminder_sent=False)
+    def save_crm_checkpoint(cls, lead_id, step: str, value: int) -> None:
+        """Grava o ID de uma etapa concluída do onboarding no Pipedrive assim que ela termina."""
+        cls._get_collection().update_one({"_id": lead_id}, {"$set": {cls.CRM_CHECKPOINT_FIELDS[step]: value}})
+
+    @classmethod
+    def complete_crm_sync(cls, lead_id, person_id: int, org_id: int, deal_id: int) -> None:
+        cls._get_collection().update_one(
+            {"_id": lead_id},
+            {"$set": {
+                "id_person_pipedrive": person_id,
+                "id_organization_pipedrive": org_id,
+                "id_deal_pipedrive": deal_id,
+                "crm_sync.status": CrmSyncOutbox.STATUS_DONE,
+                "crm_sync.last_error": None,
+            }},
+        )
+
+    @classmethod
+    def fail_crm_sync(cls, lead_id, attempts: int, next_attempt_at: datetime, error: str, final: bool) -> None:
+        cls._get_collection().update_one(
+            {"_id": lead_id},
+            {"$set": {
+                "crm_sync.status": CrmSyncOutbox.STATUS_FAILED if final else CrmSyncOutbox.STATUS_PENDING,
+                "crm_sync.attempts": attempts,
+                "crm_sync.next_attempt_at": next_attempt_at,
+                "crm_sync.last_error": error,
+            }},
+        )
+
+    @classmethod
+    def update_deal_mirror(cls, deal_id: int, stage_id: Optional[int], status: Optional[str], event_at: Optional[datetime] = None) -> int:
+        """
+        Grava a etapa/status do deal nos leads vinculados. Retorna quantos foram atualizados.
+        Leads já espelhados a partir de um estado mais recente que `event_at` não são alterados.
+        """
+        event_at = event_at or datetime.utcnow()
+        data = {"deal_synced_at": event_at}
+        if stage_id is not None:
+            data["deal_stage_id"] = int(stage_id)
+        if status is not None:
+            data["deal_status"] = status
+
+        result = cls._get_collection().update_many(
+            {"id_deal_pipedrive": deal_id, "$or": [{"deal_synced_at": None}, {"deal_synced_at": {"$lt": event_at}}]},
+            {"$set": data},
+        )
+        return result.modified_count
+
+    @classmethod
+    def stream_deal_links(cls, batch_size: int = 500) -> Iterator[Dict]:
+        """Cursor projetado (sem construir documentos) dos leads ordenados por id_deal_pipedrive."""
+        cursor = cls._get_collection().find(
+            {},
+            {"_id": 1, "id_deal_pipedrive": 1, "deal_stage_id": 1, "deal_status": 1, "crm_sync.status": 1},
+        ).sort("id_deal_pipedrive", 1).batch_size(batch_size)
+
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    @classmethod
+    def bulk_set(cls, updates: List[tuple]) -> int:
+        """Aplica vários $set (lead_id, campos) em um único bulk_write não ordenado."""
+        if not updates:
+            return 0
+        result = cls._get_collection().bulk_write(
+            [UpdateOne({"_id": lead_id}, {"$set": fields}) for lead_id, fields in updates],
+            ordered=False,
+        )
+        return result.modified_count
+
+    @classmethod
+    def bulk_set_if(cls, updates: List[tuple]) -> int:
+        """
+        Como bulk_set, mas cada $set (lead_id, valores esperados, campos) só é aplicado se o
+        lead ainda tiver os valores esperados. Retorna quantos foram atualizados.
+        """
+        if not updates:
+            return 0
+        result = cls._get_collection().bulk_write(
+            [UpdateOne(dict(expected, _id=lead_id), {"$set": fields}) for lead_id, expected, fields in updates],
+            ordered=False,
+        )
+        return result.modified_count
+
+    @staticmethod
+    def _unclaimed(job: str, claimed_before: datetime) -> Dict:
+        """Filtro de leads sem claim do job (ou com claim expirado)."""
+        field = f"{job}_claimed_at"
+        return {"$or": [{field: None}, {field: {"$lt": claimed_before}}]}
+
+    @classmethod
+    def claim_cron_job(cls, lead_id, job: str, claimed_before: datetime) -> bool:
+        """
+        Marca atomicamente o lead como em processamento pelo job do cron.
+        Retorna False se outro worker já o pegou ou se a mensagem já foi enviada.
+        """
+        query = {"_id": lead_id, f"{job}_sent": False}
+        query.update(cls._unclaimed(job, claimed_before))
+
+        result = cls._get_collection().update_one(query, {"$set": {f"{job}_claimed_at": datetime.utcnow()}})
+        return result.modified_count == 1
+
+    @classmethod
+    def _stream_cron_view(cls, query: Dict, batch_size: int, sort: str = None) -> Iterator[CronLeadView]:
+        cursor = cls._get_collection().find(query, {field: 1 for field in CronLeadView.FIELDS}).batch_size(batch_size)
+        if sort:
+            cursor = cursor.sort(sort, 1)
+
+        try:
+            for raw in cursor:
+                yield CronLeadView(raw)
+        finally:
+            cursor.close()
+
+    @classmethod
+    def find_due_actions(cls, now: datetime, batch_size: int = 500) -> Iterator[CronLeadView]:
+        """Leads com follow-up vencido (next_action_at <= now), em ordem de vencimento."""
+        return cls._stream_cron_view({"next_action_at": {"$lte": now}}, batch_size, sort="next_action_at")
+
+    @classmethod
+    def stream_all_views(cls, batch_size: int = 500) -> Iterator[CronLeadView]:
+        """Todos os leads como projeção leve (usado para recalcular next_action_at)."""
+        return cls._stream_cron_view({}, batch_size)
 
-    
     def to_dict(self) -> dict:
         result = {
             "id": str(self.id),
@@ -119,12 +373,15 @@ class Lead(Document):
             "id_person_pipedrive": self.id_person_pipedrive,
             "id_organization_pipedrive": self.id_organization_pipedrive,
             "id_deal_pipedrive": self.id_deal_pipedrive,
+            "deal_stage_id": self.deal_stage_id,
+            "deal_status": self.deal_status,
             
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "confirmation_sent": self.confirmation_sent,
             "recovery_sent": self.recovery_sent,
             "reminder_sent": self.reminder_sent,
+            "crm_sync_status": self.crm_sync.status if self.crm_sync else None,
         }
 
         specific_data = {}
@@ -0,0 +1,56 @@
+from mongoengine import Document, StringField, DateTimeField, IntField, FloatField
+from datetime import datetime
+
+
+class OutboundMessage(Document):
+    """
+    Mensagem de WhatsApp a enviar pela Z-API.
+
+    Única por (lead, tipo): enfileirar de novo a mesma mensagem não tem efeito, então
+    execuções concorrentes do cron nunca geram envio duplicado.
+    """
+    meta = {
+        "collection": "outbound_messages",
+        "strict": False,
+        "indexes": [
+            {"fields": ("lead_id", "kind"), "unique": True},
+            ("status", "next_attempt_at"),
+        ]
+    }
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    # O envio pode ter ocorrido (timeout/5xx): não é reenviado automaticamente
+    STATUS_UNKNOWN = "unknown"
+
+    KIND_CONFIRMATION = "confirmation"
+    KIND_RECOVERY = "recovery"
+    KIND_REMINDER = "reminder"
+
+    # Flag do lead marcada quando a mensagem é entregue
+    KIND_FLAGS = {
+        KIND_CONFIRMATION: "confirmation_sent",
+        KIND_RECOVERY: "recovery_sent",
+        KIND_REMINDER: "reminder_sent",
+    }
+
+    lead_id = StringField(required=True)
+    kind = StringField(required=True, choices=tuple(KIND_FLAGS))
+    phone = StringField(required=True)
+    body = StringField(required=True)
+
+    status = StringField(default=STATUS_PENDING, choices=(STATUS_PENDING, STATUS_SENDING, STATUS_SENT, STATUS_FAILED, STATUS_UNKNOWN))
+    attempts = IntField(default=0)
+    last_error = StringField()
+
+    zapi_message_id = StringField()
+    latency_ms = FloatField()
+    sent_at = DateTimeField()
+
+    next_attempt_at = DateTimeField(default=datetime.utcnow)
+    locked_until = DateTimeField()
+
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
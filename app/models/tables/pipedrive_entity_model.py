@@ -0,0 +1,25 @@
+from mongoengine import Document, StringField, DateTimeField, IntField
+from datetime import datetime
+
+
+class PipedriveEntity(Document):
+    """Cache local dos IDs de organizações/pessoas já existentes no Pipedrive."""
+    meta = {
+        "collection": "pipedrive_entities",
+        "strict": False,
+        "indexes": [
+            {"fields": ["kind", "lookup_key"], "unique": True},
+            # TTL: um ID excluído/mesclado no Pipedrive deixa de ser reaproveitado após 7 dias
+            {"fields": ["updated_at"], "expireAfterSeconds": 7 * 24 * 3600},
+        ]
+    }
+
+    KIND_ORGANIZATION = "organization"
+    KIND_PERSON = "person"
+
+    kind = StringField(required=True, choices=(KIND_ORGANIZATION, KIND_PERSON))
+    # Nome da empresa ou e-mail normalizado
+    lookup_key = StringField(required=True)
+    pipedrive_id = IntField(required=True)
+
+    updated_at = DateTimeField(default=datetime.utcnow)
@@ -0,0 +1,20 @@
+from mongoengine import Document, StringField, DateTimeField
+from datetime import datetime
+
+
+class SendSlot(Document):
+    """Agenda de envios compartilhada entre processos (um documento por instância da Z-API)."""
+    meta = {
+        "collection": "send_slots",
+        "strict": False,
+        "indexes": [
+            {"fields": ["key"], "unique": True},
+        ]
+    }
+
+    key = StringField(required=True)
+    # Última vaga reservada e a próxima que pode ser reservada
+    slot_at = DateTimeField()
+    next_slot_at = DateTimeField()
+
+    updated_at = DateTimeField(default=datetime.utcnow)
@@ -0,0 +1,22 @@
+from mongoengine import Document, StringField, DateTimeField
+from datetime import datetime
+
+
+class SlotClaim(Document):
+    """Reserva atômica de um horário da agenda (um documento por calendário + início do slot)."""
+    meta = {
+        "collection": "slot_claims",
+        "strict": False,
+        "indexes": [
+            {"fields": ["calendar_id", "slot_start"], "unique": True},
+            "lead_id",
+            # TTL: reservas de horários que já passaram são removidas um dia depois
+            {"fields": ["slot_start"], "expireAfterSeconds": 86400},
+        ]
+    }
+
+    calendar_id = StringField(required=True)
+    slot_start = DateTimeField(required=True)
+    lead_id = StringField(required=True)
+
+    created_at = DateTimeField(default=datetime.utcnow)
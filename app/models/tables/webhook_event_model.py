@@ -0,0 +1,19 @@
+from mongoengine import Document, StringField, DateTimeField
+from datetime import datetime
+
+
+class WebhookEvent(Document):
+    """Eventos de webhook já processados (deduplicação por ID do evento)."""
+    meta = {
+        "collection": "webhook_events",
+        "strict": False,
+        "indexes": [
+            {"fields": ["source", "event_id"], "unique": True},
+            # Redeliveries acontecem em minutos/horas: 7 dias de histórico bastam
+            {"fields": ["received_at"], "expireAfterSeconds": 7 * 24 * 3600},
+        ]
+    }
+
+    source = StringField(required=True)
+    event_id = StringField(required=True)
+    received_at = DateTimeField(default=datetime.utcnow)
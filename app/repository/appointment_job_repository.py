@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument
+from app.interfaces.repositories.appointment_job_repository_interface import AppointmentJobRepositoryInterface
+from app.models.tables.appointment_job_model import AppointmentJob
+
+
+class AppointmentJobRepository(AppointmentJobRepositoryInterface):
+
+    def create(self, job: AppointmentJob) -> AppointmentJob:
+        return job.save()
+
+    def claim_next(self, lease_until: datetime) -> Optional[AppointmentJob]:
+        """
+        Pega atomicamente o próximo job vencido (ou cujo lease expirou) e o marca como em execução.
+        """
+        now = datetime.utcnow()
+        raw = AppointmentJob._get_collection().find_one_and_update(
+            {
+                "$or": [
+                    {"status": AppointmentJob.STATUS_PENDING, "next_attempt_at": {"$lte": now}},
+                    {"status": AppointmentJob.STATUS_RUNNING, "locked_until": {"$lt": now}},
+                ]
+            },
+            {"$set": {"status": AppointmentJob.STATUS_RUNNING, "locked_until": lease_until, "updated_at": now}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return AppointmentJob._from_son(raw) if raw else None
+
+    def update_fields(self, job_id, data: Dict) -> bool:
+        """Atualiza o job. Jobs cancelados não são mais alterados: retorna False nesse caso."""
+        data = dict(data, updated_at=datetime.utcnow())
+        result = AppointmentJob._get_collection().update_one(
+            {"_id": job_id, "status": {"$ne": AppointmentJob.STATUS_CANCELLED}},
+            {"$set": data},
+        )
+        return result.matched_count == 1
+
+    def cancel_others(self, lead_id: str, keep_job_id) -> List[AppointmentJob]:
+        """Cancela os demais jobs ativos (pendentes, em execução ou concluídos) do lead e os retorna."""
+        active = (AppointmentJob.STATUS_PENDING, AppointmentJob.STATUS_RUNNING, AppointmentJob.STATUS_DONE)
+        collection = AppointmentJob._get_collection()
+        cancelled = []
+
+        for raw in collection.find({"lead_id": lead_id, "_id": {"$ne": keep_job_id}, "status": {"$in": active}}, {"_id": 1}):
+            updated = collection.find_one_and_update(
+                {"_id": raw["_id"], "status": {"$in": active}},
+                {"$set": {"status": AppointmentJob.STATUS_CANCELLED, "updated_at": datetime.utcnow()}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if updated:
+                cancelled.append(AppointmentJob._from_son(updated))
+        return cancelled
+
+    def find_latest_by_lead(self, lead_id: str) -> Optional[AppointmentJob]:
+        return AppointmentJob.objects(lead_id=lead_id).order_by("-created_at").first()
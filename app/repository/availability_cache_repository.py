@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.interfaces.repositories.availability_cache_repository_interface import AvailabilityCacheRepositoryInterface
+from app.models.tables.availability_cache_model import AvailabilityCacheEntry
+
+
+class AvailabilityCacheRepository(AvailabilityCacheRepositoryInterface):
+
+    def find_by_key(self, key: str) -> Optional[AvailabilityCacheEntry]:
+        return AvailabilityCacheEntry.objects(key=key).first()
+
+    def save(self, key: str, payload: List[Dict], fresh_until: datetime, expires_at: datetime, generation: int) -> bool:
+        """
+        Grava o resultado de uma carga iniciada na geração `generation`. Se a chave foi
+        invalidada depois disso, nada é gravado (a carga é anterior ao agendamento). Retorna se gravou.
+        """
+        # Entradas gravadas antes do campo existir não têm geração: equivalem à geração 0
+        generation_filter = generation if generation else {"$in": [0, None]}
+        result = AvailabilityCacheEntry._get_collection().update_one(
+            {"key": key, "generation": generation_filter},
+            {
+                "$set": {
+                    "payload": payload,
+                    "fresh_until": fresh_until,
+                    "expires_at": expires_at,
+                    "updated_at": datetime.utcnow(),
+                },
+                "$unset": {"refreshing_until": "", "failed_until": ""},
+            },
+        )
+        return result.matched_count == 1
+
+    def try_acquire_refresh(self, key: str, lease_until: datetime) -> Optional[int]:
+        """
+        Lease atômico: apenas um worker (entre todos os processos) recalcula a chave.
+        Retorna a geração da entrada no momento do lease, ou None se outro worker tem o lease.
+        """
+        now = datetime.utcnow()
+        collection = AvailabilityCacheEntry._get_collection()
+        try:
+            raw = collection.find_one_and_update(
+                {
+                    "key": key,
+                    "$or": [
+                        {"refreshing_until": None},
+                        {"refreshing_until": {"$lt": now}},
+                    ],
+                },
+                {
+                    "$set": {"refreshing_until": lease_until},
+                    "$setOnInsert": {"payload": [], "fresh_until": now, "expires_at": lease_until, "generation": 0},
+                },
+                upsert=True,
+                projection={"generation": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Outro worker criou/renovou o lease ao mesmo tempo
+            return None
+        return raw.get("generation", 0) if raw else None
+
+    def release_refresh(self, key: str, failed_until: datetime) -> None:
+        """Libera o lease após uma consulta que falhou, mantendo a cópia anterior (se houver)."""
+        AvailabilityCacheEntry._get_collection().update_one(
+            {"key": key},
+            {"$unset": {"refreshing_until": ""}, "$set": {"failed_until": failed_until}},
+        )
+
+    def invalidate_all(self) -> None:
+        """
+        Descarta as cópias e avança a geração de todas as chaves, derrubando os leases:
+        cargas iniciadas antes da invalidação não conseguem mais gravar.
+        """
+        AvailabilityCacheEntry._get_collection().update_many(
+            {},
+            {
+                "$inc": {"generation": 1},
+                "$set": {"payload": [], "fresh_until": datetime.utcnow()},
+                "$unset": {"refreshing_until": "", "failed_until": ""},
+            },
+        )
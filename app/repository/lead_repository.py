@@ -1,6 +1,7 @@
 from app.interfaces.repositories.lead_repository_interface import LeadRepositoryInterface
-from app.models.tables.lead_model import Lead
-from typing import Dict, Optional, List
+from app.models.tables.lead_model import CronLeadView, Lead
+from datetime import datetime
+from typing import Dict, Iterator, Optional, List
 
 
 class LeadRepository(LeadRepositoryInterface):
@@ -16,6 +17,9 @@ class LeadRepository(LeadRepositoryInterface):
     
     def find_by_token(self, token: str) -> Optional[Lead]:
         return Lead.objects(leadtoken=token).first()
+
+    def find_by_id(self, lead_id: str) -> Optional[Lead]:
+        return Lead.objects(id=lead_id).first()
     
     def list_all(self) -> List[Lead]:
         return list(Lead.objects())
@@ -23,11 +27,38 @@ class LeadRepository(LeadRepositoryInterface):
     def update_by_phone(self, lead_phone: str, data: Dict) -> Lead:
         return Lead.update_by_phone(lead_phone, data)
     
-    def find_pending_confirmations(self) -> List[Lead]:
-        return Lead.find_pending_confirmations()
-    
-    def find_abandoned_leads(self) -> List[Lead]:
-        return Lead.find_abandoned_leads()
-    
-    def find_upcoming_meetings(self) -> List["Lead"]:
-        return Lead.find_upcoming_meetings()
+    def clear_scheduling_day_if(self, lead_id, scheduling_day: datetime) -> bool:
+        return Lead.clear_scheduling_day_if(lead_id, scheduling_day)
+
+    def claim_crm_sync(self, lease_until: datetime, lead_id=None) -> Optional[Lead]:
+        return Lead.claim_crm_sync(lease_until, lead_id)
+
+    def save_crm_checkpoint(self, lead_id, step: str, value: int) -> None:
+        Lead.save_crm_checkpoint(lead_id, step, value)
+
+    def complete_crm_sync(self, lead_id, person_id: int, org_id: int, deal_id: int) -> None:
+        Lead.complete_crm_sync(lead_id, person_id, org_id, deal_id)
+
+    def fail_crm_sync(self, lead_id, attempts: int, next_attempt_at: datetime, error: str, final: bool) -> None:
+        Lead.fail_crm_sync(lead_id, attempts, next_attempt_at, error, final)
+
+    def update_deal_mirror(self, deal_id: int, stage_id: Optional[int], status: Optional[str], event_at: Optional[datetime] = None) -> int:
+        return Lead.update_deal_mirror(deal_id, stage_id, status, event_at)
+
+    def stream_deal_links(self, batch_size: int = 500) -> Iterator[Dict]:
+        return Lead.stream_deal_links(batch_size)
+
+    def bulk_set(self, updates: List[tuple]) -> int:
+        return Lead.bulk_set(updates)
+
+    def bulk_set_if(self, updates: List[tuple]) -> int:
+        return Lead.bulk_set_if(updates)
+
+    def find_due_actions(self, now: datetime, batch_size: int = 500) -> Iterator[CronLeadView]:
+        return Lead.find_due_actions(now, batch_size)
+
+    def stream_all_views(self, batch_size: int = 500) -> Iterator[CronLeadView]:
+        return Lead.stream_all_views(batch_size)
+
+    def claim_cron_job(self, lead_id, job: str, claimed_before: datetime) -> bool:
+        return Lead.claim_cron_job(lead_id, job, claimed_before)
@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Dict, Optional
+from pymongo import ReturnDocument
+from app.interfaces.repositories.outbound_message_repository_interface import OutboundMessageRepositoryInterface
+from app.models.tables.outbound_message_model import OutboundMessage
+
+
+class OutboundMessageRepository(OutboundMessageRepositoryInterface):
+
+    def enqueue(self, message: OutboundMessage) -> bool:
+        """
+        Insere a mensagem se ainda não existir uma do mesmo tipo para o lead.
+        Retorna True apenas quando a mensagem foi realmente enfileirada agora.
+        """
+        message.validate()
+        doc = message.to_mongo().to_dict()
+        doc.pop("_id", None)
+
+        result = OutboundMessage._get_collection().update_one(
+            {"lead_id": message.lead_id, "kind": message.kind},
+            {"$setOnInsert": doc},
+            upsert=True,
+        )
+        return result.upserted_id is not None
+
+    def claim_next(self, lease_until: datetime) -> Optional[OutboundMessage]:
+        """
+        Pega atomicamente a próxima mensagem vencida (ou cujo lease expirou) e a marca como em envio.
+        """
+        now = datetime.utcnow()
+        raw = OutboundMessage._get_collection().find_one_and_update(
+            {
+                "$or": [
+                    {"status": OutboundMessage.STATUS_PENDING, "next_attempt_at": {"$lte": now}},
+                    {"status": OutboundMessage.STATUS_SENDING, "locked_until": {"$lt": now}},
+                ]
+            },
+            {"$set": {"status": OutboundMessage.STATUS_SENDING, "locked_until": lease_until, "updated_at": now}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return OutboundMessage._from_son(raw) if raw else None
+
+    def update_fields(self, message_id, data: Dict) -> None:
+        data = dict(data, updated_at=datetime.utcnow())
+        OutboundMessage._get_collection().update_one({"_id": message_id}, {"$set": data})
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Optional
+from app.interfaces.repositories.pipedrive_entity_repository_interface import PipedriveEntityRepositoryInterface
+from app.models.tables.pipedrive_entity_model import PipedriveEntity
+
+
+class PipedriveEntityRepository(PipedriveEntityRepositoryInterface):
+
+    def find_id(self, kind: str, lookup_key: str) -> Optional[int]:
+        entity = PipedriveEntity.objects(kind=kind, lookup_key=lookup_key).only("pipedrive_id").first()
+        return entity.pipedrive_id if entity else None
+
+    def save_id(self, kind: str, lookup_key: str, pipedrive_id: int) -> None:
+        PipedriveEntity.objects(kind=kind, lookup_key=lookup_key).update_one(
+            upsert=True,
+            set__pipedrive_id=pipedrive_id,
+            set__updated_at=datetime.utcnow(),
+        )
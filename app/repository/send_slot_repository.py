@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from typing import Tuple
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.interfaces.repositories.send_slot_repository_interface import SendSlotRepositoryInterface
+from app.models.tables.send_slot_model import SendSlot
+
+
+class SendSlotRepository(SendSlotRepositoryInterface):
+
+    def reserve(self, key: str, interval: timedelta, horizon: timedelta) -> Tuple[bool, datetime]:
+        """
+        Reserva atomicamente a próxima vaga de envio da chave (entre todos os processos).
+
+        A vaga é max(agora, next_slot_at) e next_slot_at avança `interval`. Se a próxima
+        vaga estiver além do horizonte nada é reservado. Retorna (reservou, horário da vaga).
+        """
+        now = datetime.utcnow()
+        collection = SendSlot._get_collection()
+        try:
+            raw = collection.find_one_and_update(
+                {
+                    "key": key,
+                    "$or": [
+                        {"next_slot_at": None},
+                        {"next_slot_at": {"$lte": now + horizon}},
+                    ],
+                },
+                [
+                    {"$set": {"slot_at": {"$max": [now, {"$ifNull": ["$next_slot_at", now]}]}}},
+                    {"$set": {"next_slot_at": {"$add": ["$slot_at", int(interval.total_seconds() * 1000)]}, "updated_at": now}},
+                ],
+                upsert=True,
+                projection={"slot_at": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            return True, raw["slot_at"]
+        except DuplicateKeyError:
+            # O documento existe mas a próxima vaga está além do horizonte
+            raw = collection.find_one({"key": key}, {"next_slot_at": 1})
+            return False, (raw or {}).get("next_slot_at") or now + horizon
@@ -0,0 +1,26 @@
+from datetime import datetime
+from mongoengine.errors import NotUniqueError
+from app.interfaces.repositories.slot_claim_repository_interface import SlotClaimRepositoryInterface
+from app.models.tables.slot_claim_model import SlotClaim
+
+
+class SlotClaimRepository(SlotClaimRepositoryInterface):
+
+    def claim(self, calendar_id: str, slot_start: datetime, lead_id: str) -> bool:
+        """
+        Insert único protegido pelo índice (calendar_id, slot_start).
+        Retorna False se o horário já pertence a outro lead.
+        """
+        try:
+            SlotClaim(calendar_id=calendar_id, slot_start=slot_start, lead_id=lead_id).save(force_insert=True)
+            return True
+        except NotUniqueError:
+            # Reenvio do mesmo lead para o mesmo horário não é conflito
+            return SlotClaim.objects(calendar_id=calendar_id, slot_start=slot_start, lead_id=lead_id).count() > 0
+
+    def release(self, calendar_id: str, slot_start: datetime, lead_id: str) -> None:
+        SlotClaim.objects(calendar_id=calendar_id, slot_start=slot_start, lead_id=lead_id).delete()
+
+    def release_others(self, calendar_id: str, lead_id: str, keep_slot_start: datetime) -> int:
+        """Remove as reservas anteriores do lead (reagendamento), mantendo apenas o novo horário."""
+        return SlotClaim.objects(calendar_id=calendar_id, lead_id=lead_id, slot_start__ne=keep_slot_start).delete()
@@ -0,0 +1,18 @@
+from mongoengine.errors import NotUniqueError
+from app.interfaces.repositories.webhook_event_repository_interface import WebhookEventRepositoryInterface
+from app.models.tables.webhook_event_model import WebhookEvent
+
+
+class WebhookEventRepository(WebhookEventRepositoryInterface):
+
+    def register(self, source: str, event_id: str) -> bool:
+        """Registra o evento. Retorna False se ele já tinha sido recebido antes."""
+        try:
+            WebhookEvent(source=source, event_id=event_id).save(force_insert=True)
+            return True
+        except NotUniqueError:
+            return False
+
+    def unregister(self, source: str, event_id: str) -> None:
+        """Remove o registro de um evento cujo processamento falhou, para que a reentrega seja aceita."""
+        WebhookEvent.objects(source=source, event_id=event_id).delete()
@@ -2,12 +2,19 @@ from flask import Blueprint
 from app.controllers.appointment_controller import AppointmentController
 from app.services.appointment_service import AppointmentService
 from app.repository.lead_repository import LeadRepository
+from app.repository.availability_cache_repository import AvailabilityCacheRepository
+from app.repository.slot_claim_repository import SlotClaimRepository
+from app.repository.appointment_job_repository import AppointmentJobRepository
 
 appointment_bp = Blueprint("appointment", __name__)
 
 repository = LeadRepository()
-service = AppointmentService(repository)
+availability_cache_repository = AvailabilityCacheRepository()
+slot_claim_repository = SlotClaimRepository()
+job_repository = AppointmentJobRepository()
+service = AppointmentService(repository, availability_cache_repository, slot_claim_repository, job_repository)
 controller = AppointmentController(service)
 
 appointment_bp.post("/api/v1/appointment")(controller.create)
-appointment_bp.get("/api/v1/appointment")(controller.list)
\ No newline at end of file
+appointment_bp.get("/api/v1/appointment")(controller.list)
+appointment_bp.get("/api/v1/appointment/status")(controller.status)
\ No newline at end of file
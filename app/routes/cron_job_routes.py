@@ -1,12 +1,15 @@
 from flask import Blueprint
 from app.controllers.cron_job_controller import CronJobController
 from app.repository.lead_repository import LeadRepository
+from app.repository.outbound_message_repository import OutboundMessageRepository
+from app.repository.send_slot_repository import SendSlotRepository
 from app.services.cron_job_service import CronJobService
 
 cron_job_bp = Blueprint("cron_job", __name__)
 
 repository = LeadRepository()
-service = CronJobService(repository)
+outbound_repository = OutboundMessageRepository()
+service = CronJobService(repository, outbound_repository, SendSlotRepository())
 controller = CronJobController(service)
 
 cron_job_bp.get("/api/v1/cron_job")(controller.run)
\ No newline at end of file
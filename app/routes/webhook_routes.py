@@ -0,0 +1,14 @@
+from flask import Blueprint
+from app.controllers.webhook_controller import WebhookController
+from app.services.webhook_service import WebhookService
+from app.repository.lead_repository import LeadRepository
+from app.repository.webhook_event_repository import WebhookEventRepository
+
+webhook_bp = Blueprint("webhook", __name__)
+
+repository = LeadRepository()
+event_repository = WebhookEventRepository()
+service = WebhookService(repository, event_repository)
+controller = WebhookController(service)
+
+webhook_bp.post("/api/v1/webhooks/pipedrive")(controller.pipedrive)
@@ -0,0 +1,34 @@
+import hmac
+import os
+from functools import wraps
+from flask import request, jsonify
+
+
+def validate_webhook_secret(func):
+    """
+    Valida o segredo compartilhado do webhook do Pipedrive, enviado no header
+    X-Webhook-Secret ou como senha do HTTP Basic Auth configurado no webhook.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        expected_secret = os.getenv("PIPEDRIVE_WEBHOOK_SECRET")
+
+        if not expected_secret:
+            return jsonify({
+                "mensagem": "Configuração de segurança inválida",
+                "status": "error"
+            }), 500
+
+        received_secret = request.headers.get("X-Webhook-Secret")
+        if not received_secret and request.authorization:
+            received_secret = request.authorization.password
+
+        if not received_secret or not hmac.compare_digest(received_secret, expected_secret):
+            return jsonify({
+                "mensagem": "Webhook não autorizado",
+                "status": "error"
+            }), 401
+
+        return func(*args, **kwargs)
+
+    return wrapper
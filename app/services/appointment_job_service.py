@@ -0,0 +1,224 @@
+from datetime import datetime, timedelta
+import dateutil.tz
+from app.integrations.google_calendar_integration import CALENDAR_ID, create_event, delete_event
+from app.integrations.pipedrive_crm_integration import PipedriveClient
+from app.interfaces.repositories.appointment_job_repository_interface import AppointmentJobRepositoryInterface
+from app.interfaces.repositories.availability_cache_repository_interface import AvailabilityCacheRepositoryInterface
+from app.interfaces.repositories.lead_repository_interface import LeadRepositoryInterface
+from app.interfaces.repositories.slot_claim_repository_interface import SlotClaimRepositoryInterface
+from app.errors.exceptions import JobCancelledError
+from app.models.tables.appointment_job_model import AppointmentJob
+from app.models.tables.lead_model import CrmSyncOutbox
+from app.services.availability_cache import AvailabilityCache
+from app.utils.logging_config import logger
+
+
+class AppointmentJobService:
+    """
+    Executa, fora da requisição HTTP, as etapas externas de um agendamento.
+    Cada etapa tem retry próprio; etapas concluídas não são repetidas.
+    Depois do evento no Google, as etapas do Pipedrive rodam em paralelo.
+    """
+
+    STEP_GOOGLE_EVENT = "google_event"
+    STEP_DEAL_STAGE = "deal_stage"
+    STEP_CONFIRMATION_CALL = "confirmation_call"
+    STEP_MEETING_ACTIVITY = "meeting_activity"
+
+    STEPS = (STEP_GOOGLE_EVENT, STEP_DEAL_STAGE, STEP_CONFIRMATION_CALL, STEP_MEETING_ACTIVITY)
+
+    def __init__(self, repository: LeadRepositoryInterface, job_repository: AppointmentJobRepositoryInterface, slot_claim_repository: SlotClaimRepositoryInterface, availability_cache_repository: AvailabilityCacheRepositoryInterface):
+        self.repository = repository
+        self.job_repository = job_repository
+        self.slot_claim_repository = slot_claim_repository
+        self.availability_cache = AvailabilityCache(availability_cache_repository)
+        self.pipedrive_client = PipedriveClient()
+
+        self.TZ_BRASIL = dateutil.tz.gettz('America/Sao_Paulo')
+        self.MAX_STEP_ATTEMPTS = 5
+        self.BASE_RETRY_DELAY = timedelta(seconds=30)
+        self.LEASE = timedelta(minutes=2)
+
+    def process_pending(self, limit: int = 20) -> int:
+        """Processa até `limit` jobs vencidos. Retorna quantos foram processados."""
+        processed = 0
+
+        while processed < limit:
+            job = self.job_repository.claim_next(datetime.utcnow() + self.LEASE)
+            if not job:
+                break
+
+            self._run(job)
+            processed += 1
+
+        return processed
+
+    def _run(self, job: AppointmentJob):
+        lead = self.repository.find_by_id(job.lead_id)
+        if not lead:
+            logger.error(f"[APPOINTMENT_JOB_SERVICE] Lead do job {job.id} não encontrado")
+            self.job_repository.update_fields(job.id, {"status": AppointmentJob.STATUS_FAILED, "last_error": "Lead não encontrado"})
+            return
+
+        start_time = job.start_time.replace(tzinfo=dateutil.tz.UTC).astimezone(self.TZ_BRASIL)
+        steps = dict(job.steps or {})
+        pending = [step for step in self.STEPS if (steps.get(step) or {}).get("status") != "done"]
+
+        # 1. Evento no Google (as etapas do Pipedrive dependem do agendamento confirmado)
+        if self.STEP_GOOGLE_EVENT in pending:
+            try:
+                self._execute_step(self.STEP_GOOGLE_EVENT, job, lead, start_time)
+                self._mark_done(job, steps, self.STEP_GOOGLE_EVENT)
+            except JobCancelledError:
+                logger.info(f"[APPOINTMENT_JOB_SERVICE] Job {job.id} cancelado por reagendamento")
+                return
+            except Exception as e:
+                self._handle_failures(job, lead, steps, {self.STEP_GOOGLE_EVENT: e})
+                return
+
+        # 2. Etapas do Pipedrive são independentes entre si: rodam em paralelo
+        pipedrive_steps = [step for step in pending if step != self.STEP_GOOGLE_EVENT]
+        if pipedrive_steps and self._waiting_crm_sync(job, lead):
+            return
+
+        if pipedrive_steps:
+            outcome = self.pipedrive_client.run_concurrently({
+                step: (lambda step=step: self._execute_step(step, job, lead, start_time))
+                for step in pipedrive_steps
+            })
+
+            for step in outcome.results:
+                self._mark_done(job, steps, step)
+
+            if not outcome.ok:
+                self._handle_failures(job, lead, steps, outcome.errors)
+                return
+
+        self.job_repository.update_fields(job.id, {"status": AppointmentJob.STATUS_DONE, "last_error": None})
+        logger.info(f"[APPOINTMENT_JOB_SERVICE] Agendamento finalizado (job {job.id})")
+
+    def _waiting_crm_sync(self, job: AppointmentJob, lead) -> bool:
+        """
+        Lead ainda no outbox do CRM (sem deal): reagenda o job sem gastar tentativas das etapas,
+        já que o backoff do outbox é bem mais longo que o das etapas.
+        """
+        crm_sync = lead.crm_sync
+        if lead.id_deal_pipedrive or not crm_sync or crm_sync.status not in (CrmSyncOutbox.STATUS_PENDING, CrmSyncOutbox.STATUS_RUNNING):
+            return False
+
+        next_attempt_at = max(datetime.utcnow() + self.BASE_RETRY_DELAY, crm_sync.next_attempt_at or datetime.utcnow())
+        self.job_repository.update_fields(job.id, {"status": AppointmentJob.STATUS_PENDING, "next_attempt_at": next_attempt_at})
+        logger.info(f"[APPOINTMENT_JOB_SERVICE] Job {job.id} aguardando a sincronização do lead com o Pipedrive")
+        return True
+
+    def _mark_done(self, job: AppointmentJob, steps: dict, step: str):
+        state = steps.get(step) or {"status": "pending", "attempts": 0}
+        state = {"status": "done", "attempts": state["attempts"] + 1, "error": None}
+        steps[step] = state
+        self.job_repository.update_fields(job.id, {f"steps.{step}": state})
+
+    def _handle_failures(self, job: AppointmentJob, lead, steps: dict, errors: dict):
+        """Registra as etapas que falharam e reagenda o job (ou o encerra se alguma esgotou as tentativas)."""
+        updates = {"attempts": job.attempts + 1}
+        max_attempts = 0
+        exhausted_step = None
+
+        for step, error in errors.items():
+            state = steps.get(step) or {"status": "pending", "attempts": 0}
+            attempts = state["attempts"] + 1
+            max_attempts = max(max_attempts, attempts)
+            logger.error(f"[APPOINTMENT_JOB_SERVICE] Falha na etapa {step} (tentativa {attempts}): {error}")
+
+            final = attempts >= self.MAX_STEP_ATTEMPTS
+            if final and exhausted_step is None:
+                exhausted_step = step
+
+            updates[f"steps.{step}"] = {"status": "failed" if final else "retrying", "attempts": attempts, "error": str(error)}
+            updates["last_error"] = str(error)
+
+        self.job_repository.update_fields(job.id, updates)
+
+        if exhausted_step:
+            self._fail(job, lead, exhausted_step)
+        else:
+            self.job_repository.update_fields(job.id, {
+                "status": AppointmentJob.STATUS_PENDING,
+                "next_attempt_at": datetime.utcnow() + self.BASE_RETRY_DELAY * (2 ** (max_attempts - 1)),
+            })
+
+    def _fail(self, job: AppointmentJob, lead, step: str):
+        self.job_repository.update_fields(job.id, {"status": AppointmentJob.STATUS_FAILED})
+
+        # Sem evento no Google o horário volta a ficar livre. O agendamento do lead só é limpo
+        # se ainda for este horário: um job antigo não apaga um reagendamento
+        if step == self.STEP_GOOGLE_EVENT:
+            self.slot_claim_repository.release(CALENDAR_ID, job.start_time, str(lead.id))
+            self.repository.clear_scheduling_day_if(lead.id, job.start_time)
+
+    def _execute_step(self, step: str, job: AppointmentJob, lead, start_time: datetime):
+        if step == self.STEP_GOOGLE_EVENT:
+            event = create_event(
+                summary=job.summary,
+                description=job.description,
+                start_time=start_time,
+                lead_email=lead.email,
+                lead_name=lead.name,
+                # ID determinístico: um retry após falha ao gravar o job não duplica o evento
+                event_id=job.calendar_event_id,
+            )
+
+            if not event or 'htmlLink' not in event:
+                raise RuntimeError("Resposta inválida da API do Google")
+
+            job.event_id = event.get('id')
+            job.meet_link = event.get('hangoutLink')
+            if not self.job_repository.update_fields(job.id, {"event_id": job.event_id, "meet_link": job.meet_link}):
+                # Reagendado enquanto o evento era criado: quem cancelou não viu este evento
+                delete_event(job.calendar_event_id)
+                raise JobCancelledError()
+
+            self.repository.update_by_phone(lead.phone, {"meet_link": job.meet_link})
+
+            try:
+                self.availability_cache.invalidate()
+            except Exception as e:
+                logger.error(f"[APPOINTMENT_JOB_SERVICE] Erro ao invalidar cache de disponibilidade: {e}")
+            return
+
+        if not lead.id_deal_pipedrive:
+            raise RuntimeError("Lead ainda não sincronizado com o Pipedrive")
+
+        # Só um retry pode ter efeito anterior sem resposta: a primeira tentativa não consulta o CRM
+        retry = ((job.steps or {}).get(step) or {}).get("attempts", 0) > 0
+
+        if step == self.STEP_DEAL_STAGE:
+            # Deal já na etapa (retry após uma resposta perdida): não repete o PUT
+            deal = self.pipedrive_client.get_deal(lead.id_deal_pipedrive) if retry else None
+            if deal and deal.get("stage_id") == 3:
+                result = deal
+            else:
+                result = self.pipedrive_client.update_deal_stage(
+                    deal_id=lead.id_deal_pipedrive,
+                    new_stage_id=3,
+                )
+
+        elif step == self.STEP_CONFIRMATION_CALL:
+            result = self.pipedrive_client.schedule_confirmation_call(
+                meeting_datetime=start_time,
+                person_id=lead.id_person_pipedrive,
+                org_id=lead.id_organization_pipedrive,
+                deal_id=lead.id_deal_pipedrive,
+                dedupe=retry,
+            )
+
+        else:
+            result = self.pipedrive_client.schedule_meeting_activity(
+                meeting_datetime=start_time,
+                person_id=lead.id_person_pipedrive,
+                org_id=lead.id_organization_pipedrive,
+                deal_id=lead.id_deal_pipedrive,
+                dedupe=retry,
+            )
+
+        if result is None:
+            raise RuntimeError(f"Pipedrive não confirmou a etapa {step}")
@@ -1,17 +1,30 @@
 import dateutil
-from app.integrations.pipedrive_crm_integration import PipedriveClient
 from app.interfaces.repositories.lead_repository_interface import LeadRepositoryInterface
+from app.interfaces.repositories.availability_cache_repository_interface import AvailabilityCacheRepositoryInterface
+from app.interfaces.repositories.slot_claim_repository_interface import SlotClaimRepositoryInterface
+from app.interfaces.repositories.appointment_job_repository_interface import AppointmentJobRepositoryInterface
 from app.interfaces.services.appointment_service_interface import AppointmentServiceInterface
-from app.integrations.google_calendar_integration import create_event, get_available_slots
+from app.integrations.google_calendar_integration import CALENDAR_ID, delete_event, get_available_slots
+from app.models.tables.appointment_job_model import AppointmentJob
+from app.services.availability_cache import AvailabilityCache
+from app.errors.exceptions import SlotUnavailableError
 from app.utils.logging_config import logger
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 
 class AppointmentService(AppointmentServiceInterface):
 
-    def __init__(self, repository: LeadRepositoryInterface):
+    AVAILABILITY_CACHE_KEY = "availability"
+    DEFAULT_WINDOW_DAYS = 7
+    MAX_WINDOW_DAYS = 31
+    # Limita o espaço de chaves do cache: no máximo ~26 semanas canônicas
+    MAX_HORIZON_DAYS = 180
+
+    def __init__(self, repository: LeadRepositoryInterface, availability_cache_repository: AvailabilityCacheRepositoryInterface, slot_claim_repository: SlotClaimRepositoryInterface, job_repository: AppointmentJobRepositoryInterface):
         self.repository = repository
-        self.pipedrive_client = PipedriveClient()
+        self.slot_claim_repository = slot_claim_repository
+        self.job_repository = job_repository
+        self.availability_cache = AvailabilityCache(availability_cache_repository)
 
     def create_appointment(self, data: dict) -> dict:
         logger.info(f"[APPOINTMENT_SERVICE] Criando agendamento.")
@@ -31,6 +44,23 @@ class AppointmentService(AppointmentServiceInterface):
             logger.error(f"[APPOINTMENT_SERVICE] Erro ao processar data/hora: {e}")
             return {"error": f"Dados de data/hora ausentes ou inválidos: {e}"}
 
+        # Reserva atômica do horário antes de qualquer chamada externa (Google/Pipedrive)
+        slot_start = start_time_obj.astimezone(dateutil.tz.UTC).replace(tzinfo=None)
+        if not self.slot_claim_repository.claim(CALENDAR_ID, slot_start, str(lead.id)):
+            logger.warning("[APPOINTMENT_SERVICE] Horário já reservado por outro lead")
+            raise SlotUnavailableError("Horário indisponível. Escolha outro horário.")
+
+        # Reenvio (duplo clique) para o horário que o lead já reservou: devolve o job existente
+        existing = self.job_repository.find_latest_by_lead(str(lead.id))
+        if existing and existing.start_time == slot_start and existing.status not in (AppointmentJob.STATUS_FAILED, AppointmentJob.STATUS_CANCELLED):
+            logger.info(f"[APPOINTMENT_SERVICE] Agendamento já registrado para este horário (job {existing.id})")
+            return {
+                "success": True,
+                "status": existing.status,
+                "job_id": str(existing.id),
+                "expires_at": start_time_obj,
+            }
+
         lead_name = lead.get('name') if isinstance(lead, dict) else getattr(lead, 'name', 'Desconhecido')
         business = lead.get('business_name', 'N/A') if isinstance(lead, dict) else getattr(lead, 'business_name', 'N/A')
         
@@ -42,59 +72,125 @@ class AppointmentService(AppointmentServiceInterface):
         )
 
         try:
-            logger.info(f"[APPOINTMENT_SERVICE] Criando evento no google calendar")
-            event = create_event(
-                summary=summary, 
-                description=description, 
-                start_time=start_time_obj,
-                lead_email=lead.email,
-                lead_name=lead.name
-            )
-
-            if event and 'htmlLink' in event:
-                logger.info(f"[APPOINTMENT_SERVICE] Sucesso! Evento criado no Google Calendar.")
-
-                self.repository.update_by_phone(lead.phone, {"scheduling_day": start_time_obj})
-
-                self.repository.update_by_phone(lead.phone, {"meet_link": event.get('hangoutLink')})
-
-                logger.info(f"[APPOINTMENT_SERVICE] Deal ID: {lead.id_deal_pipedrive}")
-
-                self.pipedrive_client.update_deal_stage(
-                    deal_id=lead.id_deal_pipedrive,
-                    new_stage_id= 3,
-                )
-
-                self.pipedrive_client.schedule_confirmation_call(
-                    meeting_datetime=start_time_obj,
-                    person_id=lead.id_person_pipedrive,
-                    org_id=lead.id_organization_pipedrive,
-                    deal_id=lead.id_deal_pipedrive
-                )
-
-                self.pipedrive_client.schedule_meeting_activity(
-                    meeting_datetime=start_time_obj,
-                    person_id=lead.id_person_pipedrive,
-                    org_id=lead.id_organization_pipedrive,
-                    deal_id=lead.id_deal_pipedrive
-                )
-
-                return {
-                    "success": True, 
-                    "expires_at": start_time_obj,
-                    "event_id": event.get('id')
-                }
-            
-            return {"success": False, "error": "Resposta inválida da API do Google"}
-                
+            self.repository.update_by_phone(lead.phone, {"scheduling_day": start_time_obj})
+
+            # Google Calendar e Pipedrive são finalizados pelo worker (ver worker.py)
+            job = self.job_repository.create(AppointmentJob(
+                lead_id=str(lead.id),
+                start_time=slot_start,
+                summary=summary,
+                description=description,
+            ))
+
+            logger.info(f"[APPOINTMENT_SERVICE] Agendamento registrado, finalização enfileirada (job {job.id})")
+
+            # Reagendamento: cancela os jobs anteriores e remove seus eventos; só então o horário
+            # anterior volta a ficar livre (senão o worker poderia criar o evento antigo depois)
+            try:
+                if self._cancel_previous_jobs(str(lead.id), job.id):
+                    if self.slot_claim_repository.release_others(CALENDAR_ID, str(lead.id), slot_start):
+                        self.availability_cache.invalidate()
+                else:
+                    logger.warning("[APPOINTMENT_SERVICE] Evento anterior não removido; reserva anterior mantida")
+            except Exception as e:
+                logger.error(f"[APPOINTMENT_SERVICE] Erro ao liberar reserva anterior do lead: {e}")
+
+            return {
+                "success": True, 
+                "status": job.status,
+                "job_id": str(job.id),
+                "expires_at": start_time_obj,
+            }
+
         except Exception as e:
-            logger.error(f"[APPOINTMENT_SERVICE] Falha crítica na criação do evento: {str(e)}")
+            logger.error(f"[APPOINTMENT_SERVICE] Falha crítica ao registrar o agendamento: {str(e)}")
+            self.slot_claim_repository.release(CALENDAR_ID, slot_start, str(lead.id))
             return {"success": False, "error": "Ocorreu um erro interno ao processar o agendamento."}
 
-    def list_busy_slots(self) -> list:
+    def _cancel_previous_jobs(self, lead_id: str, keep_job_id) -> bool:
+        """Cancela os outros jobs do lead e remove seus eventos. False se algum evento não pôde ser removido."""
+        removed = True
+        for old_job in self.job_repository.cancel_others(lead_id, keep_job_id):
+            # O ID é determinístico: remove também um evento criado cujo ID não chegou a ser gravado
+            if not delete_event(old_job.calendar_event_id):
+                removed = False
+        return removed
+
+    def get_appointment_status(self, lead_token: str) -> dict:
+        lead = self.repository.find_by_token(lead_token)
+        if not lead:
+            raise ValueError("Lead não encontrado")
+
+        job = self.job_repository.find_latest_by_lead(str(lead.id))
+        if not job:
+            return {"status": None, "meet_link": lead.meet_link}
+
+        return job.to_status_dict()
+
+    def _parse_window(self, date_from: str = None, date_to: str = None, week: str = None) -> tuple:
+        """
+        Converte os parâmetros `from`/`to` (YYYY-MM-DD) ou `week` (YYYY-Www) na janela consultada.
+        Sem parâmetros retorna (None, None), mantendo a janela padrão.
+        """
+        try:
+            if week:
+                first_day = datetime.strptime(f"{week}-1", "%G-W%V-%u").date()
+                last_day = first_day + timedelta(days=6)
+            else:
+                first_day = date.fromisoformat(date_from) if date_from else None
+                last_day = date.fromisoformat(date_to) if date_to else None
+        except ValueError:
+            raise ValueError("Parâmetros de data inválidos. Use from/to=YYYY-MM-DD ou week=YYYY-Www")
+
+        if first_day and not last_day:
+            last_day = first_day + timedelta(days=self.DEFAULT_WINDOW_DAYS - 1)
+
+        if last_day and not first_day:
+            first_day = max(date.today(), last_day - timedelta(days=self.DEFAULT_WINDOW_DAYS - 1))
+
+        if first_day and last_day:
+            if last_day < first_day:
+                raise ValueError("A data final deve ser maior ou igual à data inicial")
+
+            # Dias passados não têm horários: a janela começa hoje (mantém o espaço de chaves limitado)
+            today = date.today()
+            if last_day < today:
+                raise ValueError("A janela de consulta já passou")
+            first_day = max(first_day, today)
+
+            if (last_day - first_day).days + 1 > self.MAX_WINDOW_DAYS:
+                raise ValueError(f"A janela de consulta não pode ultrapassar {self.MAX_WINDOW_DAYS} dias")
+            if last_day > date.today() + timedelta(days=self.MAX_HORIZON_DAYS):
+                raise ValueError(f"Só é possível consultar até {self.MAX_HORIZON_DAYS} dias à frente")
+
+        return first_day, last_day
+
+    def _load_week(self, monday: date) -> list:
+        """Disponibilidade de uma semana canônica (segunda a domingo), via cache."""
+        cache_key = f"{self.AVAILABILITY_CACHE_KEY}:week:{monday.isoformat()}"
+        return self.availability_cache.get(
+            cache_key,
+            lambda: get_available_slots(first_day=monday, last_day=monday + timedelta(days=6)),
+        ) or []
+
+    def list_busy_slots(self, date_from: str = None, date_to: str = None, week: str = None) -> list:
+        first_day, last_day = self._parse_window(date_from, date_to, week)
+
         try:
-            busy_slots = get_available_slots()
-            return busy_slots if busy_slots is not None else []
+            if not (first_day and last_day):
+                busy_slots = self.availability_cache.get(self.AVAILABILITY_CACHE_KEY, get_available_slots)
+                return busy_slots if busy_slots is not None else []
+
+            # Janelas arbitrárias são montadas a partir das semanas canônicas em cache,
+            # para que o número de chaves não cresça com as combinações de from/to
+            days = []
+            monday = first_day - timedelta(days=first_day.weekday())
+            while monday <= last_day:
+                days.extend(self._load_week(monday))
+                monday += timedelta(days=7)
+
+            first_iso, last_iso = first_day.isoformat(), last_day.isoformat()
+            return [day for day in days if first_iso <= day["date"] <= last_iso]
         except Exception as e:
             logger.error(f"[APPOINTMENT_SERVICE] Erro ao listar horários ocupados: {e}")
-            return []
\ No newline at end of file
+            return []
@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from app.interfaces.repositories.availability_cache_repository_interface import AvailabilityCacheRepositoryInterface
+from app.utils.logging_config import logger
+
+
+class AvailabilityCache:
+    """
+    Cache stale-while-revalidate da disponibilidade da agenda.
+
+    L1: dicionário em memória do processo (TTL curto).
+    L2: documento no Mongo com índice TTL, compartilhado entre os workers do gunicorn.
+
+    Depois do TTL "fresh" a cópia antiga continua sendo servida enquanto uma única
+    atualização roda em segundo plano. Misses concorrentes são agrupados em uma
+    única chamada ao Google (lock por chave no processo + lease no Mongo entre processos).
+    """
+
+    def __init__(self, repository: AvailabilityCacheRepositoryInterface):
+        self.repository = repository
+
+        self.FRESH_TTL = timedelta(seconds=int(os.getenv("AVAILABILITY_CACHE_TTL", 60)))
+        self.STALE_TTL = timedelta(seconds=int(os.getenv("AVAILABILITY_CACHE_STALE_TTL", 600)))
+        self.L1_TTL = timedelta(seconds=int(os.getenv("AVAILABILITY_CACHE_L1_TTL", 5)))
+        self.NEGATIVE_TTL = timedelta(seconds=int(os.getenv("AVAILABILITY_CACHE_NEGATIVE_TTL", 10)))
+        self.REFRESH_LEASE = timedelta(seconds=30)
+        self.MISS_WAIT_SECONDS = 5.0
+
+        self._l1: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._refreshing = set()
+
+    def _now(self) -> datetime:
+        # Datas gravadas no Mongo são "naive" em UTC
+        return datetime.utcnow()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _set_l1(self, key: str, payload: List[Dict], fresh_until: datetime):
+        with self._lock:
+            self._l1[key] = {
+                "payload": payload,
+                "fresh_until": fresh_until,
+                "l1_until": min(fresh_until, self._now() + self.L1_TTL),
+            }
+
+    def _read_l2(self, key: str) -> Optional[Dict]:
+        entry = self.repository.find_by_key(key)
+        if not entry:
+            return None
+        if not entry.payload:
+            # Sem cópia, mas a última consulta falhou há pouco: resposta negativa
+            if entry.failed_until and entry.failed_until > self._now():
+                return {"failed": True}
+            return None
+        return {"payload": entry.payload, "fresh_until": entry.fresh_until, "expires_at": entry.expires_at}
+
+    def _store(self, key: str, payload: List[Dict], generation: int):
+        now = self._now()
+        fresh_until = now + self.FRESH_TTL
+
+        # Lista vazia normalmente significa falha na consulta ao Google: não cacheia
+        if not payload:
+            return
+
+        # Invalidada durante a carga (ex.: agendamento): o resultado é antigo e não é cacheado
+        if not self.repository.save(key, payload, fresh_until, fresh_until + self.STALE_TTL, generation):
+            logger.info(f"[AVAILABILITY_CACHE] Chave invalidada durante a carga, resultado descartado ({key})")
+            return
+
+        self._set_l1(key, payload, fresh_until)
+
+    def _load(self, key: str, loader: Callable[[], List[Dict]], generation: int) -> List[Dict]:
+        """
+        Executa o loader com o lease em mãos (`generation` vem do lease). Em caso de falha
+        (exceção ou lista vazia) o lease é liberado e uma entrada negativa curta avisa os outros
+        workers, que deixam de esperar e não repetem a chamada ao Google durante NEGATIVE_TTL.
+        """
+        try:
+            payload = loader()
+        except Exception:
+            self.repository.release_refresh(key, self._now() + self.NEGATIVE_TTL)
+            raise
+
+        if not payload:
+            self.repository.release_refresh(key, self._now() + self.NEGATIVE_TTL)
+            return payload
+
+        self._store(key, payload, generation)
+        return payload
+
+    def get(self, key: str, loader: Callable[[], List[Dict]]) -> List[Dict]:
+        """Retorna a disponibilidade em cache, recalculando com `loader` quando necessário."""
+        now = self._now()
+
+        with self._lock:
+            local = self._l1.get(key)
+        if local and local["l1_until"] > now:
+            return local["payload"]
+
+        shared = self._read_l2(key)
+        if shared and shared.get("failed"):
+            return []
+
+        if shared and shared["expires_at"] > now:
+            self._set_l1(key, shared["payload"], shared["fresh_until"])
+
+            if shared["fresh_until"] <= now:
+                self._refresh_in_background(key, loader)
+            return shared["payload"]
+
+        return self._load_on_miss(key, loader)
+
+    def _load_on_miss(self, key: str, loader: Callable[[], List[Dict]]) -> List[Dict]:
+        """Single-flight: apenas uma thread por processo e um processo por vez consultam o Google."""
+        with self._key_lock(key):
+            # Outra thread pode ter preenchido o cache enquanto esperávamos o lock
+            with self._lock:
+                local = self._l1.get(key)
+            if local and local["fresh_until"] > self._now():
+                return local["payload"]
+
+            generation = self.repository.try_acquire_refresh(key, self._now() + self.REFRESH_LEASE)
+            if generation is not None:
+                return self._load(key, loader, generation)
+
+            # Outro worker está consultando: aguarda o resultado compartilhado
+            deadline = time.monotonic() + self.MISS_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(0.2)
+                shared = self._read_l2(key)
+                if shared and shared.get("failed"):
+                    return []
+                if shared:
+                    self._set_l1(key, shared["payload"], shared["fresh_until"])
+                    return shared["payload"]
+
+            # Sem lease não consulta o Google (manteria o single-flight quebrado): responde vazio
+            logger.warning("[AVAILABILITY_CACHE] Tempo de espera esgotado, sem disponibilidade em cache.")
+            return []
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], List[Dict]]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                generation = self.repository.try_acquire_refresh(key, self._now() + self.REFRESH_LEASE)
+                if generation is not None:
+                    logger.info(f"[AVAILABILITY_CACHE] Atualizando disponibilidade em segundo plano ({key})")
+                    self._load(key, loader, generation)
+            except Exception as e:
+                logger.error(f"[AVAILABILITY_CACHE] Erro ao atualizar cache em segundo plano: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def invalidate(self):
+        """Descarta a disponibilidade em cache (ex.: após um agendamento confirmado)."""
+        with self._lock:
+            self._l1.clear()
+        self.repository.invalidate_all()
+        logger.info("[AVAILABILITY_CACHE] Cache de disponibilidade invalidado.")
@@ -0,0 +1,94 @@
+from datetime import datetime
+from app.integrations.pipedrive_crm_integration import PipedriveClient
+from app.interfaces.repositories.lead_repository_interface import LeadRepositoryInterface
+from app.models.tables.lead_model import CrmSyncOutbox
+from app.utils.logging_config import logger
+
+
+class CrmReconciliationService:
+    """
+    Compara os leads do Mongo com os deals do Pipedrive em um merge-join por ID de deal.
+
+    Os dois lados são lidos em streaming (páginas do Pipedrive e cursor projetado do Mongo),
+    então a memória fica constante independentemente do número de leads.
+    """
+
+    SAMPLE_SIZE = 20
+
+    def __init__(self, repository: LeadRepositoryInterface):
+        self.repository = repository
+        self.pipedrive_client = PipedriveClient()
+
+    def run(self, repair: bool = False, batch_size: int = 500) -> dict:
+        report = {
+            "leads": 0,
+            "matched": 0,
+            "missing_deal_id": 0,
+            "deleted_deal": 0,
+            "stage_drift": 0,
+            "repaired": 0,
+            "samples": {"missing_deal_id": [], "deleted_deal": []},
+        }
+        pending_updates = []
+
+        def queue(lead_id, fields: dict):
+            if not repair:
+                return
+            pending_updates.append((lead_id, fields))
+            if len(pending_updates) >= batch_size:
+                report["repaired"] += self.repository.bulk_set(pending_updates)
+                pending_updates.clear()
+
+        def sample(kind: str, lead_id):
+            if len(report["samples"][kind]) < self.SAMPLE_SIZE:
+                report["samples"][kind].append(str(lead_id))
+
+        # Reenfileira o onboarding: o fluxo com checkpoint retoma a partir do deal
+        resync = {
+            "crm_sync.status": CrmSyncOutbox.STATUS_PENDING,
+            "crm_sync.next_attempt_at": datetime.utcnow(),
+            "crm_sync.attempts": 0,
+        }
+
+        deals = self.pipedrive_client.iter_deals(page_size=batch_size)
+        current_deal = next(deals, None)
+
+        for lead in self.repository.stream_deal_links(batch_size):
+            report["leads"] += 1
+            deal_id = lead.get("id_deal_pipedrive")
+            sync_status = (lead.get("crm_sync") or {}).get("status")
+
+            if not deal_id:
+                # Sincronização ainda em andamento não é divergência
+                if sync_status in (CrmSyncOutbox.STATUS_PENDING, CrmSyncOutbox.STATUS_RUNNING):
+                    continue
+                report["missing_deal_id"] += 1
+                sample("missing_deal_id", lead["_id"])
+                queue(lead["_id"], resync)
+                continue
+
+            while current_deal is not None and current_deal["id"] < deal_id:
+                current_deal = next(deals, None)
+
+            if current_deal is None or current_deal["id"] != deal_id:
+                report["deleted_deal"] += 1
+                sample("deleted_deal", lead["_id"])
+                queue(lead["_id"], dict(resync, id_deal_pipedrive=None))
+                continue
+
+            report["matched"] += 1
+
+            stage_id, status = current_deal.get("stage_id"), current_deal.get("status")
+            if lead.get("deal_stage_id") != stage_id or lead.get("deal_status") != status:
+                report["stage_drift"] += 1
+                queue(lead["_id"], {"deal_stage_id": stage_id, "deal_status": status, "deal_synced_at": datetime.utcnow()})
+
+        if pending_updates:
+            report["repaired"] += self.repository.bulk_set(pending_updates)
+
+        logger.info(
+            f"[CRM_RECONCILIATION_SERVICE] {report['leads']} leads verificados: "
+            f"{report['missing_deal_id']} sem deal, {report['deleted_deal']} com deal inexistente, "
+            f"{report['stage_drift']} com etapa divergente, {report['repaired']} corrigidos"
+        )
+        return report
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from app.integrations.pipedrive_crm_integration import PipedriveClient
+from app.interfaces.repositories.lead_repository_interface import LeadRepositoryInterface
+from app.interfaces.repositories.pipedrive_entity_repository_interface import PipedriveEntityRepositoryInterface
+from app.models.tables.lead_model import Lead
+from app.services.pipedrive_entity_resolver import PipedriveEntityResolver
+from app.utils.logging_config import logger
+
+
+class CrmSyncService:
+    """
+    Drena o outbox "crm_sync" dos leads: cria Org -> Pessoa -> Deal no Pipedrive
+    e grava os IDs de volta no lead, fora da requisição de captura.
+    """
+
+    def __init__(self, repository: LeadRepositoryInterface, entity_repository: PipedriveEntityRepositoryInterface, details_pusher: Optional[Callable[[Lead], None]] = None):
+        self.repository = repository
+        self.pipedrive_client = PipedriveClient()
+        self.entity_resolver = PipedriveEntityResolver(entity_repository, self.pipedrive_client)
+        self.details_pusher = details_pusher
+
+        self.MAX_ATTEMPTS = 8
+        self.BASE_RETRY_DELAY = timedelta(seconds=30)
+        self.LEASE = timedelta(minutes=2)
+
+    def process_pending(self, limit: int = 20) -> int:
+        """Processa até `limit` leads com sincronização pendente. Retorna quantos foram processados."""
+        processed = 0
+
+        while processed < limit:
+            lead = self.repository.claim_crm_sync(datetime.utcnow() + self.LEASE)
+            if not lead:
+                break
+
+            self._sync(lead)
+            processed += 1
+
+        return processed
+
+    def _sync(self, lead: Lead):
+        attempts = (lead.crm_sync.attempts or 0) + 1
+
+        def on_checkpoint(step: str, value: int):
+            self.repository.save_crm_checkpoint(lead.id, step, value)
+
+            if step == "org_id":
+                self.entity_resolver.remember_organization(lead.business_name, value)
+            elif step == "person_id":
+                self.entity_resolver.remember_person(lead.email, value)
+
+        try:
+            # Organização/pessoa já existentes (cache local -> busca no Pipedrive) não são recriadas
+            org_id = lead.id_organization_pipedrive or self.entity_resolver.resolve_organization(lead.business_name)
+            person_id = lead.id_person_pipedrive or self.entity_resolver.resolve_person(lead.email)
+
+            data_id = self.pipedrive_client.process_new_lead(
+                company_name=lead.business_name,
+                lead_name=lead.name,
+                email=lead.email,
+                phone=lead.phone,
+                org_id=org_id,
+                person_id=person_id,
+                deal_id=lead.id_deal_pipedrive,
+                on_checkpoint=on_checkpoint,
+            )
+
+            if not data_id:
+                raise RuntimeError("Pipedrive não concluiu o fluxo Org -> Pessoa -> Deal")
+
+            # Dados do formulário que chegaram antes dos IDs do Pipedrive existirem. Uma falha aqui
+            # mantém o outbox pendente; como os IDs já foram gravados, o retry só reenvia os detalhes.
+            if self.details_pusher:
+                fresh_lead = self.repository.find_by_id(str(lead.id))
+                if fresh_lead:
+                    self.details_pusher(fresh_lead)
+
+            self.repository.complete_crm_sync(lead.id, data_id["person_id"], data_id["org_id"], data_id["deal_id"])
+            logger.info(f"[CRM_SYNC_SERVICE] Lead sincronizado com o Pipedrive (Deal ID: {data_id['deal_id']})")
+
+        except Exception as e:
+            final = attempts >= self.MAX_ATTEMPTS
+            next_attempt_at = datetime.utcnow() + self.BASE_RETRY_DELAY * (2 ** (attempts - 1))
+
+            logger.error(f"[CRM_SYNC_SERVICE] Falha ao sincronizar lead {lead.id} (tentativa {attempts}): {e}")
+            self.repository.fail_crm_sync(lead.id, attempts, next_attempt_at, str(e), final)
+            return
@@ -1,149 +1,188 @@
+import os
 from datetime import datetime, timedelta
+from typing import Dict
 import dateutil.tz
 from app.interfaces.repositories.lead_repository_interface import LeadRepositoryInterface
+from app.interfaces.repositories.outbound_message_repository_interface import OutboundMessageRepositoryInterface
+from app.interfaces.repositories.send_slot_repository_interface import SendSlotRepositoryInterface
 from app.interfaces.services.cron_job_service_interface import CronJobServiceInterface
-from app.integrations.zapi_integration import ZAPIClient
+from app.models.tables.lead_model import CronLeadView, Lead
+from app.services.outbound_message_service import OutboundMessageService
 from app.utils.logging_config import logger
 
 
 class CronJobService(CronJobServiceInterface):
-    class CronJobService(CronJobServiceInterface):
-        def __init__(self, repository: LeadRepositoryInterface):
-            self.lead_repository = repository
-            self.zapi = ZAPIClient()
-            
-            # Definição de Fuso Horário (Brasil)
-            self.TZ_BRASIL = dateutil.tz.gettz('America/Sao_Paulo')
-            self.TZ_UTC = dateutil.tz.tzutc()
-            
-            # Configurações de tempo
-            self.DELAY_CONFIRMATION = timedelta(hours=1)
-            self.DELAY_RECOVERY = timedelta(hours=1)
-
-        def _get_now(self):
-            """Retorna a hora atual com Fuso Horário de Brasília."""
-            return datetime.now(self.TZ_BRASIL)
-
-        def _ensure_timezone(self, dt: datetime):
-            """
-            CORREÇÃO: Converte o horário do banco (UTC) para o horário de Brasília.
-            Se o banco enviar 13:00+00:00, esta função retornará 10:00-03:00.
-            """
-            if dt is None: 
-                return None
-            
-            # Se o datetime vier sem fuso (naive) do banco, tratamos como UTC
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=self.TZ_UTC)
-                
-            # .astimezone() CONVERTE as horas (ex: 13h -> 10h) em vez de apenas renomear
-            return dt.astimezone(self.TZ_BRASIL)
-
-    def send_confirmation_messager(self):
+    def __init__(self, repository: LeadRepositoryInterface, outbound_repository: OutboundMessageRepositoryInterface, send_slot_repository: SendSlotRepositoryInterface = None):
+        self.lead_repository = repository
+        self.outbound = OutboundMessageService(repository, outbound_repository, send_slot_repository)
+        # O envio é do worker (fila outbound_messages). Só para implantações sem worker: lote enviado no próprio cron
+        self.INLINE_SEND_BATCH = int(os.getenv("CRON_INLINE_SEND_BATCH", 0))
+        self.READ_BATCH_SIZE = int(os.getenv("CRON_READ_BATCH_SIZE", 500))
+
+        # Definição de Fuso Horário (Brasil)
+        self.TZ_BRASIL = dateutil.tz.gettz('America/Sao_Paulo')
+        self.TZ_UTC = dateutil.tz.tzutc()
+
+        # Claim mais antigo que isso é de uma execução que morreu: o lead pode ser pego de novo
+        self.CLAIM_TTL = timedelta(minutes=15)
+
+        # Um builder por tipo de follow-up: um novo tipo só precisa de uma regra em
+        # Lead.compute_next_action e de uma entrada aqui
+        self.MESSAGE_BUILDERS = {
+            Lead.ACTION_CONFIRMATION: self._confirmation_message,
+            Lead.ACTION_RECOVERY: self._recovery_message,
+            Lead.ACTION_REMINDER: self._reminder_message,
+        }
+
+    def _get_utc_now(self):
+        """Hora atual em UTC (aware), usada nos filtros das consultas."""
+        return datetime.now(self.TZ_UTC)
+
+    def _ensure_timezone(self, dt: datetime):
         """
-        Envia mensagem de confirmação 1h APÓS o cliente ter realizado o agendamento.
+        CORREÇÃO: Converte o horário do banco (UTC) para o horário de Brasília.
+        Se o banco enviar 13:00+00:00, esta função retornará 10:00-03:00.
         """
-        logger.info("[CRON_JOB_SERVICE] Iniciando verificação de confirmação de agendamento...")
-        
-        leads = self.lead_repository.find_pending_confirmations() 
-        now = self._get_now()
-        
-        count = 0
-        
-        for lead in leads:
-            try:
-                if not lead.scheduling_day or getattr(lead, 'confirmation_sent', False):
-                    continue
+        if dt is None:
+            return None
+
+        # Se o datetime vier sem fuso (naive) do banco, tratamos como UTC
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=self.TZ_UTC)
+
+        # .astimezone() CONVERTE as horas (ex: 13h -> 10h) em vez de apenas renomear
+        return dt.astimezone(self.TZ_BRASIL)
 
-                booking_time = getattr(lead, 'updated_at', lead.created_at)
-                booking_time = self._ensure_timezone(booking_time)
-
-                if now - booking_time >= self.DELAY_CONFIRMATION:
-                    
-                    first_name = lead.name.split()[0] if lead.name else "visitante"
-                    meeting_date = self._ensure_timezone(lead.scheduling_day)
-                    date_str = meeting_date.strftime('%d/%m às %H:%M')
-                    
-                    msg = f"Eaee {first_name}! Tudo certo?\n\nAqui é o Marcelo Baldi da b2bflow.\n\nVi que você agendou uma reunião comigo dia {date_str}. e antes quero te ligar e entender melhor seu cenário para tornar nossa call mais produtiva\n\nQual horário posso te ligar?"
-                    
-                    if self.zapi.send_message(lead.phone, msg):
-                        self.lead_repository.update_by_phone(lead.phone, {"confirmation_sent": True})
-                        logger.info(f"[CRON_JOB_SERVICE] Confirmação enviada para lead")
-                        count += 1
-            
+    def run_all(self) -> Dict[str, str]:
+        """
+        Varre os leads com follow-up vencido (uma consulta indexada em next_action_at),
+        e enfileira as mensagens; o envio fica com o worker.
+        """
+        results = {}
+
+        try:
+            counts = self.enqueue_due_actions()
+            results["confirmarion_messages"] = f"Processamento finalizado. {counts[Lead.ACTION_CONFIRMATION]} confirmações enfileiradas."
+            results["recovery_message"] = f"Processamento finalizado. {counts[Lead.ACTION_RECOVERY]} recuperações enfileiradas."
+            results["meeting_reminder"] = f"Processamento finalizado. {counts[Lead.ACTION_REMINDER]} lembretes enfileirados."
+        except Exception as e:
+            logger.error(f"[CRON_JOB_SERVICE] Erro na varredura de follow-ups: {e}")
+            results["follow_ups"] = f"Erro no processamento: {e}"
+
+        if self.INLINE_SEND_BATCH > 0:
+            try:
+                processed = self.outbound.process_pending(self.INLINE_SEND_BATCH)
+                results["outbound_messages"] = f"{processed} mensagens processadas."
             except Exception as e:
-                logger.error(f"[CRON_JOB_SERVICE] Erro confirmação lead {getattr(lead, 'id', 'Unknown')}: {e}")
-        return f"Processamento finalizado. {count} confirmações enviadas."
+                logger.error(f"[CRON_JOB_SERVICE] Erro ao enviar mensagens da fila: {e}")
+                results["outbound_messages"] = f"Erro no processamento: {e}"
 
-    def send_recovery_message(self):
+        return results
+
+    def enqueue_due_actions(self) -> Dict[str, int]:
         """
-        Recupera leads que se cadastraram há mais de 1h e NÃO agendaram.
+        Enfileira o follow-up vencido de cada lead e grava o próximo next_action_at.
+        Lembretes cuja janela já passou são apenas recalculados. Retorna quantos foram enfileirados por tipo.
         """
-        logger.info("[CRON_JOB_SERVICE] Iniciando verificação de recuperação (abandono)...")
-        
-        leads = self.lead_repository.find_abandoned_leads()
-        now = self._get_now()
-        
-        count = 0
-
-        for lead in leads:
+        logger.info("[CRON_JOB_SERVICE] Iniciando varredura de follow-ups vencidos...")
+
+        now = self._get_utc_now()
+        claimed_before = now - self.CLAIM_TTL
+        counts = {kind: 0 for kind in self.MESSAGE_BUILDERS}
+        updates = []
+
+        for lead in self.lead_repository.find_due_actions(now, batch_size=self.READ_BATCH_SIZE):
             try:
-                if lead.scheduling_day is not None or getattr(lead, 'recovery_sent', False):
+                due_at, kind = Lead.compute_next_action(lead, now)
+                taken_elsewhere = False
+
+                # Mais de um follow-up pode vencer na mesma execução (ex.: confirmação e lembrete)
+                while kind is not None and due_at <= Lead.to_utc_naive(now):
+                    msg = self.MESSAGE_BUILDERS[kind](lead)
+                    if not self._enqueue(lead, kind, msg, claimed_before):
+                        taken_elsewhere = True
+                        break
+
+                    counts[kind] += 1
+                    setattr(lead, f"{kind}_claimed_at", now)
+                    due_at, kind = Lead.compute_next_action(lead, now)
+
+                if taken_elsewhere:
+                    # Outro worker pegou o lead; ele grava o próximo vencimento
                     continue
-                
-                created_at = self._ensure_timezone(lead.created_at)
 
-                if now - created_at >= self.DELAY_RECOVERY:
+                # Condicional: se o lead foi salvo (ex.: reagendado) depois da leitura, o save já
+                # recalculou next_action_at e esta escrita, feita a partir da cópia antiga, é descartada
+                expected = {
+                    "updated_at": lead.updated_at,
+                    "next_action_at": lead.next_action_at,
+                    "next_action_kind": lead.next_action_kind,
+                }
+                updates.append((lead.id, expected, {"next_action_at": due_at, "next_action_kind": kind}))
+                if len(updates) >= self.READ_BATCH_SIZE:
+                    self.lead_repository.bulk_set_if(updates)
+                    updates = []
 
-                    if lead.type_lead == 'venda':
-                        first_name = lead.name.split()[0] if lead.name else "Meu querido"
-                        msg = f"Eaee {first_name}! Tudo certo?\n\nAqui é o Marcelo Baldi, da b2bflow.\n\nVi que entrou em contato para entender\ncomo implementar IA na operação e acredito que posso ajudar.\n\nQual horário posso te ligar para entender melhor seu momento?"
+            except Exception as e:
+                logger.error(f"[CRON_JOB_SERVICE] Erro no follow-up do lead {getattr(lead, 'id', 'Unknown')}: {e}")
 
-                    else:
-                        first_name = lead.name.split()[0] if lead.name else "Meu querido"
-                        msg = f"Eaee {first_name}! Tudo certo?\n\nAqui é o Marcelo Baldi.\n\nVi que você se cadastrou para entender como criar um negócio de IA lucrativo.\n\nQual horário posso te ligar para entender se consigo ajudar?"
+        self.lead_repository.bulk_set_if(updates)
+        return counts
 
-                    
-                    if self.zapi.send_message(lead.phone, msg):
-                        self.lead_repository.update_by_phone(lead.phone, {"recovery_sent": True})
-                        logger.info(f"[CRON_JOB_SERVICE] Recuperação enviada para lead")
-                        count += 1
+    def refresh_next_actions(self) -> int:
+        """Recalcula next_action_at de todos os leads (backfill após deploy). Retorna quantos foram gravados."""
+        now = self._get_utc_now()
+        updates, written = [], 0
 
-            except Exception as e:
-                logger.error(f"[CRON_JOB_SERVICE] Erro recuperação lead {getattr(lead, 'id', 'Unknown')}: {e}")
-        return f"Processamento finalizado. {count} recuperações enviadas."
-    
-    def send_meeting_reminder(self):
+        for lead in self.lead_repository.stream_all_views(batch_size=self.READ_BATCH_SIZE):
+            due_at, kind = Lead.compute_next_action(lead, now)
+            if (due_at, kind) == (lead.next_action_at, lead.next_action_kind):
+                continue
+
+            updates.append((lead.id, {"next_action_at": due_at, "next_action_kind": kind}))
+            if len(updates) >= self.READ_BATCH_SIZE:
+                written += self.lead_repository.bulk_set(updates)
+                updates = []
+
+        written += self.lead_repository.bulk_set(updates)
+        logger.info(f"[CRON_JOB_SERVICE] next_action_at recalculado em {written} lead(s)")
+        return written
+
+    def _enqueue(self, lead: CronLeadView, kind: str, msg: str, claimed_before: datetime) -> bool:
         """
-        Envia um lembrete se faltar aproximadamente 1 hora para a reunião.
-        (Janela de 50 a 70 minutos para garantir captura)
+        Enfileira a mensagem (idempotente por lead + tipo) e faz o claim do lead para o tipo.
+        False se outro worker já fez o claim. Enfileirar antes do claim garante que uma
+        execução interrompida entre as duas escritas não perca a mensagem.
         """
-        logger.info("[CRON_JOB_SERVICE] Iniciando verificação de lembrete de reunião...")
-        
-        leads = self.lead_repository.find_upcoming_meetings()
-        now = self._get_now()
-        count = 0
+        queued = self.outbound.enqueue(lead, kind, msg)
 
-        for lead in leads:
-            try:
-                if not lead.scheduling_day or getattr(lead, 'reminder_sent', False):
-                    continue
+        if not self.lead_repository.claim_cron_job(lead.id, kind, claimed_before):
+            return False
 
-                meeting_time = self._ensure_timezone(lead.scheduling_day)
-                time_remaining = meeting_time - now
-
-                if timedelta(minutes=50) <= time_remaining <= timedelta(minutes=70):
-                    
-                    first_name = lead.name.split()[0] if lead.name else "Cliente"
-                    time_str = meeting_time.strftime('%H:%M')
-                    
-                    msg = f"Bom dia {first_name}! Tudo certo?\n\nPara facilitar seu acesso nossa reunião {time_str}\nsegue o link da call.\n\nlink:{lead.meet_link}\n\nQualquer coisa só chamar!"
-
-                    if self.zapi.send_message(lead.phone, msg):
-                        self.lead_repository.update_by_phone(lead.phone, {"reminder_sent": True})
-                        logger.info(f"[CRON_JOB_SERVICE] Lembrete 1H enviado para lead")
-                        count += 1
-            
-            except Exception as e:
-                logger.error(f"[CRON_JOB_SERVICE] Erro lembrete lead {getattr(lead, 'id', 'Unknown')}: {e}")
-        return f"Processamento finalizado. {count} lembretes enviados."
+        if queued:
+            logger.info(f"[CRON_JOB_SERVICE] Mensagem {kind} enfileirada para lead")
+        return True
+
+    def _confirmation_message(self, lead: CronLeadView) -> str:
+        """Confirmação enviada 1h APÓS o cliente ter realizado o agendamento."""
+        first_name = lead.name.split()[0] if lead.name else "visitante"
+        meeting_date = self._ensure_timezone(lead.scheduling_day)
+        date_str = meeting_date.strftime('%d/%m às %H:%M')
+
+        return f"Eaee {first_name}! Tudo certo?\n\nAqui é o Marcelo Baldi da b2bflow.\n\nVi que você agendou uma reunião comigo dia {date_str}. e antes quero te ligar e entender melhor seu cenário para tornar nossa call mais produtiva\n\nQual horário posso te ligar?"
+
+    def _recovery_message(self, lead: CronLeadView) -> str:
+        """Recuperação de leads que se cadastraram há mais de 1h e NÃO agendaram."""
+        first_name = lead.name.split()[0] if lead.name else "Meu querido"
+
+        if lead.type_lead == 'venda':
+            return f"Eaee {first_name}! Tudo certo?\n\nAqui é o Marcelo Baldi, da b2bflow.\n\nVi que entrou em contato para entender\ncomo implementar IA na operação e acredito que posso ajudar.\n\nQual horário posso te ligar para entender melhor seu momento?"
+
+        return f"Eaee {first_name}! Tudo certo?\n\nAqui é o Marcelo Baldi.\n\nVi que você se cadastrou para entender como criar um negócio de IA lucrativo.\n\nQual horário posso te ligar para entender se consigo ajudar?"
+
+    def _reminder_message(self, lead: CronLeadView) -> str:
+        """Lembrete enviado quando falta aproximadamente 1 hora para a reunião."""
+        first_name = lead.name.split()[0] if lead.name else "Cliente"
+        time_str = self._ensure_timezone(lead.scheduling_day).strftime('%H:%M')
+
+        return f"Bom dia {first_name}! Tudo certo?\n\nPara facilitar seu acesso nossa reunião {time_str}\nsegue o link da call.\n\nlink:{lead.meet_link}\n\nQualquer coisa só chamar!"
@@ -3,7 +3,7 @@ import re
 from app.interfaces.services.lead_service_interface import LeadServiceInterface
 from app.interfaces.repositories.lead_repository_interface import LeadRepositoryInterface
 from app.integrations.pipedrive_crm_integration import PipedriveClient
-from app.models.tables.lead_model import Lead
+from app.models.tables.lead_model import CrmSyncOutbox, Lead
 from typing import Dict, List
 from app.utils.logging_config import logger
 from app.security.session_token import SessionTokenService
@@ -64,18 +64,10 @@ class LeadService(LeadServiceInterface):
         )
 
         try:
+            # O lead e a entrada de outbox "crm_sync" são gravados na mesma escrita;
+            # o Pipedrive é sincronizado pelo worker (CrmSyncService)
             lead = Lead(**data)
-            
-            data_id = self.pipedrive_client.process_new_lead(
-                company_name=data["business_name"],
-                lead_name=data["name"],
-                email=data["email"],
-                phone=data["phone"],
-            )
-
-            lead.id_person_pipedrive = data_id["person_id"]
-            lead.id_organization_pipedrive = data_id["org_id"]
-            lead.id_deal_pipedrive = data_id["deal_id"]
+            lead.crm_sync = CrmSyncOutbox()
 
             lead = self.repository.create(lead)
 
@@ -107,21 +99,49 @@ class LeadService(LeadServiceInterface):
             data=data
         )
 
-        if updated_lead.type_lead == 'venda':
-            return self.update_sales_lead(updated_lead)
+        if not updated_lead.id_deal_pipedrive:
+            # Ainda no outbox: os detalhes serão enviados junto com a sincronização do CRM
+            logger.info(f"[LEAD_SERVICE] Lead ainda não sincronizado com o Pipedrive, detalhes ficam pendentes")
+            return {
+                "message": "Lead atualizado com sucesso",
+                "token": updated_lead.leadtoken,
+                "status": "updated",
+            }
+
+        return self.push_crm_details(updated_lead)
+
+    def push_crm_details(self, lead: Lead) -> Dict:
+        """Envia ao Pipedrive os dados do formulário de acordo com o tipo do lead."""
+        if lead.type_lead == 'venda' and lead.sales_data:
+            return self.update_sales_lead(lead)
         
-        if updated_lead.type_lead == 'consultoria':
-            return self.update_followup_lead(updated_lead)
+        if lead.type_lead == 'consultoria' and lead.followup_data:
+            return self.update_followup_lead(lead)
+
+        return {
+            "message": "Lead atualizado com sucesso",
+            "token": lead.leadtoken,
+            "status": "updated",
+        }
     
     def list_leads(self,) -> List[Dict]:
         leads = self.repository.list_all()
         return [lead.to_dict() for lead in leads]
     
+    def _flush_or_raise(self, buffer) -> None:
+        """Envia as mutações do buffer; levanta se algum recurso não foi confirmado pelo Pipedrive."""
+        results = buffer.flush()
+        failed = [f"{endpoint}/{resource_id}" for (endpoint, resource_id), result in results.items() if result is None]
+        if failed:
+            raise RuntimeError(f"Pipedrive não confirmou a atualização de {', '.join(failed)}")
+
     def update_sales_lead(self, lead: Lead) -> Dict:
         try:
             id_faturamento = self.pipedrive_client._get_pipedrive_option_id("faturamento", lead.sales_data.invoicing)
             id_funcionarios = self.pipedrive_client._get_pipedrive_option_id("funcionarios", lead.sales_data.collaborators)
 
+            buffer = self.pipedrive_client.mutation_buffer()
+
             self.pipedrive_client.update_organization_details(
                 url="organizations",
                 org_id=lead.id_organization_pipedrive,
@@ -129,6 +149,7 @@ class LeadService(LeadServiceInterface):
                 faturamento=id_faturamento,
                 funcionarios=id_funcionarios,
                 produto=lead.sales_data.product_of_interest,
+                buffer=buffer,
             )
 
             deal_id = lead.id_deal_pipedrive
@@ -137,10 +158,14 @@ class LeadService(LeadServiceInterface):
                 self.pipedrive_client.update_deal_stage(
                     deal_id=deal_id,
                     new_stage_id=2,
+                    buffer=buffer,
                 )
             else:
                 logger.warning(f"[LEAD_SERVICE] Aviso: Deal '{deal_id}' não encontrado para atualização.")
 
+            # Campos e etapa do mesmo deal seguem em um único PUT
+            self._flush_or_raise(buffer)
+
             return {
                 "message": "Lead atualizado com sucesso",
                 "token": lead.leadtoken,
@@ -171,12 +196,15 @@ class LeadService(LeadServiceInterface):
 
         try:
             logger.info(f"[LEAD_SERVICE] Atualizando campos do lead")
+            buffer = self.pipedrive_client.mutation_buffer()
+
             self.pipedrive_client.update_organization_details(
                 url="deals",
                 org_id=lead.id_deal_pipedrive,
                 desafio=valor_desafio_final,
                 momento=id_momento,
                 # capacidade_investimento=id_capacidade_investimento,
+                buffer=buffer,
             )
 
             deal_id = lead.id_deal_pipedrive
@@ -185,10 +213,14 @@ class LeadService(LeadServiceInterface):
                 self.pipedrive_client.update_deal_stage(
                     deal_id=deal_id,
                     new_stage_id=2,
+                    buffer=buffer,
                 )
             else:
                 logger.warning(f"[LEAD_SERVICE] Aviso: Deal '{deal_id}' não encontrado para atualização.")
 
+            # Campos e etapa do mesmo deal seguem em um único PUT
+            self._flush_or_raise(buffer)
+
             return {
                 "message": "Lead atualizado com sucesso",
                 "token": lead.leadtoken,
@@ -0,0 +1,184 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.integrations.circuit_breaker import CircuitOpenError
+from app.integrations.send_scheduler import SendDeferred
+from app.integrations.zapi_integration import AmbiguousSendError, PermanentSendError, ZAPIClient
+from app.interfaces.repositories.lead_repository_interface import LeadRepositoryInterface
+from app.interfaces.repositories.outbound_message_repository_interface import OutboundMessageRepositoryInterface
+from app.interfaces.repositories.send_slot_repository_interface import SendSlotRepositoryInterface
+from app.models.tables.outbound_message_model import OutboundMessage
+from app.utils.logging_config import logger
+
+
+# Pool de envios compartilhado pelo processo: limita as conexões simultâneas com a Z-API
+_send_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CRON_MAX_WORKERS", 8)),
+    thread_name_prefix="zapi-send",
+)
+
+
+class OutboundMessageService:
+    """
+    Fila durável de mensagens de WhatsApp.
+
+    O cron apenas enfileira; os envios (com retry, backoff e registro de ID/latência da
+    Z-API) são feitos em lotes por `process_pending`, chamado pelo worker.
+    """
+
+    def __init__(self, repository: LeadRepositoryInterface, outbound_repository: OutboundMessageRepositoryInterface, send_slot_repository: SendSlotRepositoryInterface = None):
+        self.repository = repository
+        self.outbound_repository = outbound_repository
+        # Com o repositório de vagas, o ritmo de envio por instância vale para todos os processos
+        self.zapi = ZAPIClient(send_slot_repository)
+
+        self.MAX_ATTEMPTS = 5
+        self.BASE_RETRY_DELAY = timedelta(minutes=1)
+        self.LEASE = timedelta(minutes=2)
+        self.FLUSH_SIZE = int(os.getenv("OUTBOUND_FLUSH_SIZE", 50))
+
+    def enqueue(self, lead, kind: str, body: str) -> bool:
+        """Enfileira a mensagem do lead. Retorna False se ela já estava na fila."""
+        return self.outbound_repository.enqueue(OutboundMessage(
+            lead_id=str(lead.id),
+            kind=kind,
+            phone=lead.phone,
+            body=body,
+        ))
+
+    def process_pending(self, limit: int = 20) -> int:
+        """Envia até `limit` mensagens vencidas em paralelo. Retorna quantas foram processadas."""
+        lease_until = datetime.utcnow() + self.LEASE
+        messages = []
+
+        while len(messages) < limit:
+            message = self.outbound_repository.claim_next(lease_until)
+            if not message:
+                break
+            messages.append(message)
+
+        if not messages:
+            return 0
+
+        futures = {_send_executor.submit(self.zapi.send_text, message.phone, message.body): message for message in messages}
+        circuit_open = False
+        sent = deferred = 0
+        delivered = []
+
+        for future in as_completed(futures):
+            message = futures[future]
+
+            if future.cancelled():
+                self._release(message, timedelta(seconds=self.zapi.breaker.reset_timeout))
+                continue
+
+            try:
+                result = future.result()
+            except CircuitOpenError:
+                # Z-API indisponível: devolve o restante à fila sem gastar tentativas
+                self._release(message, timedelta(seconds=self.zapi.breaker.reset_timeout))
+                if not circuit_open:
+                    circuit_open = True
+                    skipped = sum(1 for pending in futures if pending.cancel())
+                    logger.warning(f"[OUTBOUND_MESSAGE_SERVICE] Circuito da Z-API aberto; {skipped + 1} envio(s) devolvido(s) à fila")
+                continue
+            except SendDeferred as e:
+                # Acima do ritmo da instância: fica para o próximo ciclo, sem gastar tentativa
+                self._release(message, timedelta(seconds=e.retry_after))
+                deferred += 1
+                continue
+            except PermanentSendError as e:
+                # Repetir não adianta (telefone inválido, 4xx): falha definitiva já na primeira vez
+                self._fail(message, str(e), final=True)
+                continue
+            except AmbiguousSendError as e:
+                self._park_unknown(message, str(e))
+                continue
+            except Exception as e:
+                self._fail(message, str(e))
+                continue
+
+            if result is None:
+                self._fail(message, "Z-API não confirmou o envio")
+                continue
+
+            self._mark_sent(message, result)
+            delivered.append(message)
+            sent += 1
+            if len(delivered) >= self.FLUSH_SIZE:
+                self._flush_lead_flags(delivered)
+                delivered = []
+
+        self._flush_lead_flags(delivered)
+
+        logger.info(f"[OUTBOUND_MESSAGE_SERVICE] {sent}/{len(messages)} mensagem(ns) enviada(s), {deferred} adiada(s) pelo ritmo de envio")
+        return len(messages)
+
+    def _mark_sent(self, message: OutboundMessage, result: dict):
+        """
+        Grava o envio confirmado na hora: se o processo morrer antes do fim do lote, o lease
+        expira e a mensagem não pode voltar a ser pega como pendente (envio duplicado).
+        """
+        try:
+            self.outbound_repository.update_fields(message.id, {
+                "status": OutboundMessage.STATUS_SENT,
+                "attempts": message.attempts + 1,
+                "zapi_message_id": result.get("message_id"),
+                "latency_ms": result.get("latency_ms"),
+                "sent_at": datetime.utcnow(),
+                "locked_until": None,
+            })
+        except Exception as e:
+            logger.error(f"[OUTBOUND_MESSAGE_SERVICE] Erro ao registrar envio da mensagem {message.id}: {e}")
+
+    def _flush_lead_flags(self, delivered: list):
+        """
+        Marca as flags dos leads em um bulk_write não ordenado. Atrasar essa escrita é seguro:
+        o claim do cron e o índice único (lead_id, kind) já impedem um novo enfileiramento.
+        """
+        if not delivered:
+            return
+
+        try:
+            self.repository.bulk_set([
+                (ObjectId(message.lead_id), {OutboundMessage.KIND_FLAGS[message.kind]: True})
+                for message in delivered
+            ])
+        except Exception as e:
+            logger.error(f"[OUTBOUND_MESSAGE_SERVICE] Erro ao marcar {len(delivered)} envio(s) nos leads: {e}")
+
+    def _fail(self, message: OutboundMessage, error: str, final: bool = False):
+        attempts = message.attempts + 1
+        final = final or attempts >= self.MAX_ATTEMPTS
+        logger.error(f"[OUTBOUND_MESSAGE_SERVICE] Falha ao enviar {message.kind} do lead {message.lead_id} (tentativa {attempts}): {error}")
+
+        self.outbound_repository.update_fields(message.id, {
+            "status": OutboundMessage.STATUS_FAILED if final else OutboundMessage.STATUS_PENDING,
+            "attempts": attempts,
+            "last_error": error,
+            "next_attempt_at": datetime.utcnow() + self.BASE_RETRY_DELAY * (2 ** (attempts - 1)),
+            "locked_until": None,
+        })
+
+    def _park_unknown(self, message: OutboundMessage, error: str):
+        """
+        O envio pode ter sido entregue: a mensagem sai da fila como "unknown" em vez de ser
+        reenviada às cegas (o que poderia duplicar o WhatsApp). A conferência é manual.
+        """
+        logger.error(f"[OUTBOUND_MESSAGE_SERVICE] Envio de {message.kind} do lead {message.lead_id} com resultado incerto: {error}")
+
+        self.outbound_repository.update_fields(message.id, {
+            "status": OutboundMessage.STATUS_UNKNOWN,
+            "attempts": message.attempts + 1,
+            "last_error": error,
+            "locked_until": None,
+        })
+
+    def _release(self, message: OutboundMessage, delay: timedelta):
+        """Devolve a mensagem à fila sem contar tentativa."""
+        self.outbound_repository.update_fields(message.id, {
+            "status": OutboundMessage.STATUS_PENDING,
+            "next_attempt_at": datetime.utcnow() + delay,
+            "locked_until": None,
+        })
@@ -0,0 +1,61 @@
+import re
+import unicodedata
+from typing import Optional
+from app.integrations.pipedrive_crm_integration import PipedriveClient
+from app.interfaces.repositories.pipedrive_entity_repository_interface import PipedriveEntityRepositoryInterface
+from app.models.tables.pipedrive_entity_model import PipedriveEntity
+from app.utils.logging_config import logger
+
+
+class PipedriveEntityResolver:
+    """
+    Reaproveita organizações/pessoas já criadas no Pipedrive.
+    Consulta primeiro o cache local (Mongo) e, em caso de miss, a busca do Pipedrive.
+    """
+
+    def __init__(self, repository: PipedriveEntityRepositoryInterface, pipedrive_client: PipedriveClient):
+        self.repository = repository
+        self.pipedrive_client = pipedrive_client
+
+    @staticmethod
+    def normalize_name(name: str) -> Optional[str]:
+        if not name:
+            return None
+        text = unicodedata.normalize("NFKD", name)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+        return re.sub(r"\s+", " ", text).strip().casefold() or None
+
+    @staticmethod
+    def normalize_email(email: str) -> Optional[str]:
+        return email.strip().lower() if email else None
+
+    def _resolve(self, kind: str, lookup_key: Optional[str], search_term: str, search) -> Optional[int]:
+        if not lookup_key:
+            return None
+
+        cached_id = self.repository.find_id(kind, lookup_key)
+        if cached_id:
+            logger.info(f"[PIPEDRIVE_ENTITY_RESOLVER] {kind} reaproveitada do cache local")
+            return cached_id
+
+        found_id = search(search_term)
+        if found_id:
+            logger.info(f"[PIPEDRIVE_ENTITY_RESOLVER] {kind} encontrada na busca do Pipedrive")
+            self.repository.save_id(kind, lookup_key, found_id)
+        return found_id
+
+    def resolve_organization(self, name: str) -> Optional[int]:
+        return self._resolve(PipedriveEntity.KIND_ORGANIZATION, self.normalize_name(name), name, self.pipedrive_client.search_organization)
+
+    def resolve_person(self, email: str) -> Optional[int]:
+        return self._resolve(PipedriveEntity.KIND_PERSON, self.normalize_email(email), email, self.pipedrive_client.search_person)
+
+    def remember_organization(self, name: str, org_id: int) -> None:
+        lookup_key = self.normalize_name(name)
+        if lookup_key and org_id:
+            self.repository.save_id(PipedriveEntity.KIND_ORGANIZATION, lookup_key, org_id)
+
+    def remember_person(self, email: str, person_id: int) -> None:
+        lookup_key = self.normalize_email(email)
+        if lookup_key and person_id:
+            self.repository.save_id(PipedriveEntity.KIND_PERSON, lookup_key, person_id)
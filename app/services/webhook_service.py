@@ -0,0 +1,72 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from app.interfaces.repositories.lead_repository_interface import LeadRepositoryInterface
+from app.interfaces.repositories.webhook_event_repository_interface import WebhookEventRepositoryInterface
+from app.interfaces.services.webhook_service_interface import WebhookServiceInterface
+from app.utils.logging_config import logger
+
+
+class WebhookService(WebhookServiceInterface):
+
+    SOURCE_PIPEDRIVE = "pipedrive"
+
+    def __init__(self, repository: LeadRepositoryInterface, event_repository: WebhookEventRepositoryInterface):
+        self.repository = repository
+        self.event_repository = event_repository
+
+    def _event_id(self, meta: Dict, raw_body: bytes) -> str:
+        """
+        ID do próprio evento (v2 envia um UUID em meta.id). Na v1 meta.id é o ID do objeto e
+        request_id/correlation_id são compartilhados entre eventos, então o hash do corpo identifica reentregas.
+        """
+        if str(meta.get("version", "")).startswith("2") and meta.get("id"):
+            return str(meta["id"])
+        return hashlib.sha256(raw_body).hexdigest()
+
+    @staticmethod
+    def _event_time(meta: Dict) -> Optional[datetime]:
+        """Momento da alteração no Pipedrive (UTC, sem tzinfo), se informado no evento."""
+        timestamp = meta.get("timestamp")
+        try:
+            if meta.get("timestamp_micro"):
+                return datetime.utcfromtimestamp(int(meta["timestamp_micro"]) / 1_000_000)
+            if isinstance(timestamp, (int, float)) or str(timestamp).isdigit():
+                return datetime.utcfromtimestamp(int(timestamp))
+            if timestamp:
+                parsed = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+                return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+        except (TypeError, ValueError):
+            logger.warning(f"[WEBHOOK_SERVICE] Timestamp de evento inválido: {timestamp}")
+        return None
+
+    def handle_pipedrive_event(self, payload: Dict, raw_body: bytes) -> Dict:
+        meta = payload.get("meta") or {}
+        entity = meta.get("entity") or meta.get("object")
+        action = meta.get("action")
+
+        if entity != "deal" or action not in ("updated", "change"):
+            return {"status": "ignored"}
+
+        # v2 envia o estado atual em "data"; v1 em "current"
+        deal = payload.get("data") or payload.get("current") or {}
+        deal_id = deal.get("id") or meta.get("entity_id") or meta.get("id")
+        if not deal_id:
+            raise ValueError("Evento de deal sem ID")
+
+        event_id = self._event_id(meta, raw_body)
+        if not self.event_repository.register(self.SOURCE_PIPEDRIVE, event_id):
+            logger.info(f"[WEBHOOK_SERVICE] Evento duplicado ignorado (deal {deal_id})")
+            return {"status": "duplicate"}
+
+        # Eventos fora de ordem: leads espelhados a partir de um estado mais recente não são alterados
+        try:
+            updated = self.repository.update_deal_mirror(int(deal_id), deal.get("stage_id"), deal.get("status"), self._event_time(meta))
+        except Exception:
+            # Sem isso a reentrega do Pipedrive seria descartada como duplicada
+            self.event_repository.unregister(self.SOURCE_PIPEDRIVE, event_id)
+            raise
+
+        logger.info(f"[WEBHOOK_SERVICE] Etapa do deal {deal_id} espelhada em {updated} lead(s)")
+
+        return {"status": "processed", "updated": updated}
@@ -0,0 +1,79 @@
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Dict, Iterable, List, Tuple
+
+
+START_HOUR = 9
+END_HOUR = 19
+
+ONE_DAY = timedelta(days=1)
+ONE_HOUR = timedelta(hours=1)
+
+# Rótulos pré-calculados para não alocar uma string nova por slot
+HOUR_LABELS = {hour: f"{hour:02d}:00" for hour in range(START_HOUR, END_HOUR)}
+
+
+def merge_intervals(intervals: Iterable[Tuple[datetime, datetime]]) -> List[List[datetime]]:
+    """
+    Ordena os intervalos ocupados uma única vez e junta os que se sobrepõem/encostam.
+    O resultado é uma lista disjunta e ordenada, pronta para a varredura.
+    """
+    merged: List[List[datetime]] = []
+
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    return merged
+
+
+def build_available_days(busy_intervals: Iterable[Tuple[datetime, datetime]], first_day: date, last_day: date, tz: tzinfo) -> List[Dict]:
+    """
+    Varre (sweep-line) os intervalos ocupados contra a grade de trabalho (09:00–19:00, seg–sex).
+
+    Cada slot de uma hora é marcado individualmente: um evento de 30 minutos ocupa apenas
+    o slot correspondente, não o dia inteiro. Dias sem nenhum slot livre são omitidos.
+    Custo linear em (dias + eventos) após a ordenação inicial.
+    """
+    merged = merge_intervals(busy_intervals)
+    total = len(merged)
+    cursor = 0
+
+    available_days = []
+    current_day = first_day
+
+    while current_day <= last_day:
+        if current_day.weekday() >= 5:
+            current_day += ONE_DAY
+            continue
+
+        day_slots = []
+        has_free_slot = False
+
+        for hour in range(START_HOUR, END_HOUR):
+            slot_start = datetime(current_day.year, current_day.month, current_day.day, hour, tzinfo=tz)
+            slot_end = slot_start + ONE_HOUR
+
+            # Descarta intervalos que terminaram antes do slot atual (nunca mais serão usados)
+            while cursor < total and merged[cursor][1] <= slot_start:
+                cursor += 1
+
+            is_busy = cursor < total and merged[cursor][0] < slot_end
+            has_free_slot = has_free_slot or not is_busy
+
+            day_slots.append({
+                "time": HOUR_LABELS[hour],
+                "available": not is_busy
+            })
+
+        if has_free_slot:
+            available_days.append({
+                "date": current_day.isoformat(),
+                "slots": day_slots
+            })
+
+        current_day += ONE_DAY
+
+    return available_days
@@ -0,0 +1,25 @@
+from dotenv import load_dotenv
+from app.database.db_config import init_db
+from app.repository.lead_repository import LeadRepository
+from app.repository.outbound_message_repository import OutboundMessageRepository
+from app.services.cron_job_service import CronJobService
+
+
+load_dotenv()
+
+
+def main():
+    """
+    Recalcula next_action_at/next_action_kind de todos os leads.
+
+    Uso (uma vez após o deploy; pode ser repetido sem efeito colateral):
+        python backfill_next_action.py
+    """
+    init_db()
+
+    service = CronJobService(LeadRepository(), OutboundMessageRepository())
+    print(f"{service.refresh_next_actions()} lead(s) atualizados.")
+
+
+if __name__ == '__main__':
+    main()
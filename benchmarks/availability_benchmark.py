@@ -0,0 +1,78 @@
+"""
+Benchmark do motor de disponibilidade (sweep-line) com milhares de intervalos ocupados sintéticos.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.availability_benchmark [--events 5000] [--days 365] [--runs 20]
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from app.utils.availability_engine import END_HOUR, START_HOUR, build_available_days
+
+
+TZ_BRASILIA = timezone(timedelta(hours=-3))
+
+
+def synthetic_busy_intervals(first_day: date, days: int, events: int, seed: int = 42) -> list:
+    """Gera eventos aleatórios (15 a 120 minutos) espalhados pela janela."""
+    rng = random.Random(seed)
+    intervals = []
+
+    for _ in range(events):
+        day = first_day + timedelta(days=rng.randrange(days))
+        start = datetime(day.year, day.month, day.day, rng.randrange(7, 21), rng.choice((0, 15, 30, 45)), tzinfo=TZ_BRASILIA)
+        intervals.append((start, start + timedelta(minutes=rng.choice((15, 30, 60, 90, 120)))))
+
+    return intervals
+
+
+def legacy_available_days(busy_intervals: list, first_day: date, last_day: date) -> list:
+    """Algoritmo anterior: O(dias × eventos), descartando o dia inteiro por qualquer ocupação."""
+    busy_slots = [{"data": start.strftime('%Y-%m-%d')} for start, _ in busy_intervals]
+    available_days = []
+    current_day = first_day
+
+    while current_day <= last_day:
+        if current_day.weekday() < 5 and not any(s['data'] == current_day.isoformat() for s in busy_slots):
+            available_days.append({
+                "date": current_day.isoformat(),
+                "slots": [{"time": f"{hour:02d}:00", "available": True} for hour in range(START_HOUR, END_HOUR)]
+            })
+        current_day += timedelta(days=1)
+
+    return available_days
+
+
+def measure(func, runs: int) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - started) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    first_day = date.today() + timedelta(days=1)
+    last_day = first_day + timedelta(days=args.days - 1)
+    intervals = synthetic_busy_intervals(first_day, args.days, args.events)
+
+    sweep_ms = measure(lambda: build_available_days(intervals, first_day, last_day, TZ_BRASILIA), args.runs)
+    legacy_ms = measure(lambda: legacy_available_days(intervals, first_day, last_day), args.runs)
+
+    result = build_available_days(intervals, first_day, last_day, TZ_BRASILIA)
+    free_slots = sum(slot["available"] for day in result for slot in day["slots"])
+
+    print(f"eventos={args.events} dias={args.days} execuções={args.runs}")
+    print(f"sweep-line : {sweep_ms:8.2f} ms/execução ({len(result)} dias, {free_slots} slots livres)")
+    print(f"legado     : {legacy_ms:8.2f} ms/execução")
+
+
+if __name__ == "__main__":
+    main()
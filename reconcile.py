@@ -0,0 +1,32 @@
+import argparse
+import json
+from dotenv import load_dotenv
+from app.database.db_config import init_db
+from app.repository.lead_repository import LeadRepository
+from app.services.crm_reconciliation_service import CrmReconciliationService
+
+
+load_dotenv()
+
+
+def main():
+    """
+    Reconciliação Mongo x Pipedrive.
+
+    Uso:
+        python reconcile.py                # apenas relatório
+        python reconcile.py --repair       # corrige divergências em lotes
+    """
+    parser = argparse.ArgumentParser(description="Reconcilia os leads do Mongo com os deals do Pipedrive.")
+    parser.add_argument("--repair", action="store_true", help="Corrige as divergências encontradas")
+    parser.add_argument("--batch-size", type=int, default=500, help="Tamanho das páginas/lotes")
+    args = parser.parse_args()
+
+    init_db()
+
+    report = CrmReconciliationService(LeadRepository()).run(repair=args.repair, batch_size=args.batch_size)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
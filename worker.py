@@ -0,0 +1,69 @@
+import os
+import time
+from dotenv import load_dotenv
+from app.database.db_config import init_db
+from app.repository.lead_repository import LeadRepository
+from app.repository.appointment_job_repository import AppointmentJobRepository
+from app.repository.slot_claim_repository import SlotClaimRepository
+from app.repository.availability_cache_repository import AvailabilityCacheRepository
+from app.repository.pipedrive_entity_repository import PipedriveEntityRepository
+from app.repository.outbound_message_repository import OutboundMessageRepository
+from app.repository.send_slot_repository import SendSlotRepository
+from app.services.appointment_job_service import AppointmentJobService
+from app.services.crm_sync_service import CrmSyncService
+from app.services.lead_service import LeadService
+from app.services.outbound_message_service import OutboundMessageService
+from app.utils.logging_config import logger
+
+
+load_dotenv()
+
+
+def build_drainers() -> list:
+    """Filas processadas pelo worker, em ordem de execução a cada ciclo."""
+    lead_repository = LeadRepository()
+
+    appointment_jobs = AppointmentJobService(
+        lead_repository,
+        AppointmentJobRepository(),
+        SlotClaimRepository(),
+        AvailabilityCacheRepository(),
+    )
+
+    lead_service = LeadService(lead_repository)
+    crm_sync = CrmSyncService(lead_repository, PipedriveEntityRepository(), details_pusher=lead_service.push_crm_details)
+
+    outbound_messages = OutboundMessageService(lead_repository, OutboundMessageRepository(), SendSlotRepository())
+
+    return [
+        ("crm_sync", crm_sync.process_pending),
+        ("appointment_jobs", appointment_jobs.process_pending),
+        ("outbound_messages", outbound_messages.process_pending),
+    ]
+
+
+def main():
+    """Loop do worker: processa os jobs pendentes fora do ciclo das requisições HTTP."""
+    init_db()
+
+    poll_interval = float(os.getenv("WORKER_POLL_INTERVAL", 2))
+    batch_size = int(os.getenv("WORKER_BATCH_SIZE", 20))
+    drainers = build_drainers()
+
+    logger.info("[WORKER] Worker iniciado.")
+
+    while True:
+        processed = 0
+
+        for name, drain in drainers:
+            try:
+                processed += drain(batch_size)
+            except Exception as e:
+                logger.error(f"[WORKER] Erro ao processar fila {name}: {e}")
+
+        if not processed:
+            time.sleep(poll_interval)
+
+
+if __name__ == '__main__':
+    main()